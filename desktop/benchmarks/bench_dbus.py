@@ -0,0 +1,153 @@
+"""D-Bus call latency: GetState versus GetRepos + GetQueueCount.
+
+Run from the ``desktop`` directory:
+
+    python benchmarks/bench_dbus.py
+    python benchmarks/bench_dbus.py --calls 5000 --repos 50 --queued 1000
+
+The script re-runs itself under ``dbus-run-session`` so the daemon gets
+a private session bus, and points the XDG directories at a scratch
+directory holding *--repos* configured repositories and *--queued*
+queued issues.  It starts the daemon, times *--calls* round trips of
+each kind, then asks the daemon to quit.  The daemon needs a display
+(use ``xvfb-run`` on a headless machine).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_DESKTOP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+_PRIVATE_BUS_FLAG = "GHISSUE_BENCH_PRIVATE_BUS"
+_STARTUP_TIMEOUT = 15.0
+
+
+def _reexec_on_private_bus():
+    env = {**os.environ, _PRIVATE_BUS_FLAG: "1"}
+    cmd = ["dbus-run-session", "--", sys.executable, os.path.abspath(__file__),
+           *sys.argv[1:]]
+    try:
+        os.execvpe(cmd[0], cmd, env)
+    except FileNotFoundError:
+        sys.exit("dbus-run-session not found; install dbus")
+
+
+def _prepare(scratch: str, repos: int, queued: int):
+    for name in ("config", "data", "cache"):
+        os.makedirs(os.path.join(scratch, name))
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(scratch, "config")
+    os.environ["XDG_DATA_HOME"] = os.path.join(scratch, "data")
+    os.environ["XDG_CACHE_HOME"] = os.path.join(scratch, "cache")
+
+    config_dir = os.path.join(scratch, "config", "ghissue")
+    os.makedirs(config_dir)
+    with open(os.path.join(config_dir, "config.json"), "w") as f:
+        json.dump({"repos": [
+            {"owner": "octo", "name": f"repo{i}", "color": "#238636",
+             "default_labels": []}
+            for i in range(repos)
+        ]}, f)
+
+    # Imported only now, so the queue picks up the scratch XDG_DATA_HOME.
+    sys.path.insert(0, _DESKTOP_DIR)
+    from ghissue.queue import IssueQueue, QueuedIssue
+
+    q = IssueQueue()
+    for i in range(queued):
+        q.enqueue(QueuedIssue(
+            title=f"Issue {i}", body="x" * 200, labels=[],
+            owner="octo", repo=f"repo{i % max(repos, 1)}",
+        ))
+
+
+def _time_calls(call, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def _report(name: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<28} median {statistics.median(samples):8.0f} µs   "
+          f"p95 {p95:8.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--queued", type=int, default=200)
+    args = parser.parse_args()
+
+    if os.environ.get(_PRIVATE_BUS_FLAG) != "1":
+        _reexec_on_private_bus()
+
+    from gi.repository import Gio, GLib
+
+    with tempfile.TemporaryDirectory() as scratch:
+        _prepare(scratch, args.repos, args.queued)
+        from ghissue.client import APP_ID, DBUS_PATH
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-c",
+             "from ghissue.main import run_daemon; run_daemon()"],
+            cwd=_DESKTOP_DIR,
+            env=os.environ,
+        )
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+
+        def _call(method, reply_type):
+            return bus.call_sync(
+                APP_ID, DBUS_PATH, APP_ID, method, None,
+                GLib.VariantType(reply_type), Gio.DBusCallFlags.NONE,
+                5000, None,
+            )
+
+        try:
+            deadline = time.monotonic() + _STARTUP_TIMEOUT
+            while True:
+                if daemon.poll() is not None:
+                    sys.exit("daemon exited during startup")
+                try:
+                    _call("GetQueueCount", "(i)")
+                    break
+                except GLib.Error:
+                    if time.monotonic() > deadline:
+                        sys.exit("daemon did not come up")
+                    time.sleep(0.05)
+
+            state = _call("GetState", "(a{sv})").unpack()[0]
+            print(f"repos: {len(state['repos'])}  queued: {state['queue-count']}  "
+                  f"calls: {args.calls}")
+
+            def _old_pair():
+                json.loads(_call("GetRepos", "(s)").unpack()[0])
+                _call("GetQueueCount", "(i)")
+
+            _call("GetState", "(a{sv})")  # warm up
+            _report("GetState", _time_calls(
+                lambda: _call("GetState", "(a{sv})").unpack(), args.calls,
+            ))
+            _report("GetRepos + GetQueueCount", _time_calls(_old_pair, args.calls))
+        finally:
+            try:
+                _call("Quit", "()")
+            except GLib.Error:
+                pass
+            try:
+                daemon.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                daemon.kill()
+
+
+if __name__ == "__main__":
+    main()
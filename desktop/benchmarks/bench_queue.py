@@ -0,0 +1,172 @@
+"""Compare the journal-backed IssueQueue with the old whole-file JSON queue.
+
+Run from the ``desktop`` directory:
+
+    python benchmarks/bench_queue.py
+    python benchmarks/bench_queue.py --sizes 10 1000 --body-bytes 4096
+
+For each size it times enqueueing N issues, removing them one at a time,
+and draining a queue of N issues against a no-op API.  The legacy queue
+is quadratic, so its 10k run takes tens of minutes; pass ``--legacy-max``
+to skip it above a given size.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ghissue import queue as queue_mod  # noqa: E402
+from ghissue.api import BatchResult, IssueResponse  # noqa: E402
+from ghissue.ledger import SubmissionLedger  # noqa: E402
+from ghissue.queue import IssueQueue, QueuedIssue  # noqa: E402
+
+
+class LegacyQueue(IssueQueue):
+    """The pre-journal implementation: load, modify, rewrite queue.json."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._path = path
+        # Shared drain() records batches in flight; give it the same cost.
+        self._ledger = SubmissionLedger(
+            os.path.join(os.path.dirname(path), "inflight.jsonl"),
+        )
+
+    def _load(self):
+        try:
+            with open(self._path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save(self, items):
+        directory = os.path.dirname(self._path)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(items, f, indent=2)
+        os.replace(tmp, self._path)
+
+    def enqueue(self, issue):
+        with self._lock:
+            items = self._load()
+            items.append(asdict(issue))
+            self._save(items)
+
+    def remove(self, issue_id):
+        with self._lock:
+            items = self._load()
+            items = [i for i in items if i.get("id") != issue_id]
+            self._save(items)
+
+    def remove_many(self, issue_ids):
+        # The old drain removed submitted issues one at a time.
+        for issue_id in issue_ids:
+            self.remove(issue_id)
+
+    def get_all(self):
+        with self._lock:
+            items = self._load()
+        return [QueuedIssue(**i) for i in items]
+
+    def count(self):
+        with self._lock:
+            return len(self._load())
+
+
+class _NullAPI:
+    def create_issues_batch(self, token, issues, cancel=None):
+        return BatchResult(issues={
+            issue.id: IssueResponse(number=0, html_url="", title=issue.title)
+            for issue in issues
+        })
+
+
+def _make_issues(n, body_bytes):
+    body = "x" * body_bytes
+    return [
+        QueuedIssue(title=f"Issue {i}", body=body, labels=["bug"],
+                    owner="octo", repo=f"repo{i % 8}")
+        for i in range(n)
+    ]
+
+
+def _journal_queue(directory):
+    queue_mod._DATA_DIR = directory
+    queue_mod._JOURNAL_FILE = os.path.join(directory, "queue.jsonl")
+    queue_mod._LEGACY_QUEUE_FILE = os.path.join(directory, "queue.json")
+    queue_mod._LEDGER_FILE = os.path.join(directory, "inflight.jsonl")
+    return IssueQueue()
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _settle(q):
+    """Wait for a background compaction to finish before cleanup."""
+    while getattr(q, "_compacting", False):
+        time.sleep(0.01)
+
+
+def _bench(make_queue, n, body_bytes):
+    issues = _make_issues(n, body_bytes)
+    results = {}
+    with tempfile.TemporaryDirectory() as d:
+        q = make_queue(d)
+
+        def _enqueue():
+            for issue in issues:
+                q.enqueue(issue)
+
+        def _remove():
+            for issue in issues:
+                q.remove(issue.id)
+
+        results["enqueue"] = _timed(_enqueue)
+        results["remove"] = _timed(_remove)
+        _settle(q)
+    with tempfile.TemporaryDirectory() as d:
+        q = make_queue(d)
+        for issue in issues:
+            q.enqueue(issue)
+        results["drain"] = _timed(lambda: q.drain(_NullAPI(), "token"))
+        assert q.count() == 0
+        _settle(q)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 1000, 10000])
+    parser.add_argument("--body-bytes", type=int, default=1024)
+    parser.add_argument("--legacy-max", type=int, default=None,
+                        help="skip the legacy queue above this many items")
+    args = parser.parse_args()
+
+    impls = [
+        ("legacy", lambda d: LegacyQueue(os.path.join(d, "queue.json"))),
+        ("journal", _journal_queue),
+    ]
+    print(f"{'impl':<8} {'items':>7} {'enqueue':>10} {'remove':>10} {'drain':>10}")
+    for n in args.sizes:
+        for name, make_queue in impls:
+            if (name == "legacy" and args.legacy_max is not None
+                    and n > args.legacy_max):
+                continue
+            r = _bench(make_queue, n, args.body_bytes)
+            print(f"{name:<8} {n:>7} {r['enqueue']:>9.3f}s "
+                  f"{r['remove']:>9.3f}s {r['drain']:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Keystroke-to-redraw latency of the repository picker at 50k repos.
+
+Run from the ``desktop`` directory:
+
+    python benchmarks/bench_repo_picker.py
+    python benchmarks/bench_repo_picker.py --repos 100000 --query ghissue
+
+Each keystroke runs what the picker does once its debounce fires:
+search the fuzzy index and load the best matches into a Gtk.ListStore
+bound to a TreeView.  With a display the TreeView is realised and the
+main loop is run until the redraw is done.  Without GTK only the search
+is timed.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ghissue.fuzzy import FuzzyIndex  # noqa: E402
+
+try:
+    import gi
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gtk
+    _HAVE_DISPLAY = Gtk.init_check(sys.argv)[0]
+except (ImportError, ValueError):
+    Gtk = None
+    _HAVE_DISPLAY = False
+
+_WORDS = (
+    "api web core ui infra tools docs github issue tracker desktop mobile "
+    "android ios service data ml bot cli sdk auth billing search"
+).split()
+
+_MAX_MATCHES = 500  # keep in step with ghissue/dialogs/settings.py
+
+
+def _make_names(n: int) -> list[str]:
+    rnd = random.Random(0)
+    names = [
+        f"org{rnd.randrange(500)}/{rnd.choice(_WORDS)}-"
+        f"{rnd.choice(_WORDS)}{rnd.randrange(1000)}"
+        for _ in range(n - 1)
+    ]
+    names.insert(rnd.randrange(n), "danielhaas/ghissue")
+    return names
+
+
+def _keystrokes(query: str) -> list[str]:
+    """Type *query* one character at a time, then delete it again."""
+    typed = [query[:i] for i in range(1, len(query) + 1)]
+    return typed + typed[-2::-1] + [""]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repos", type=int, default=50000)
+    parser.add_argument("--query", default="ghissue")
+    args = parser.parse_args()
+
+    names = _make_names(args.repos)
+    started = time.perf_counter()
+    index = FuzzyIndex()
+    for name in names:
+        index.add(name)
+    print(f"indexed {len(names)} repos in {time.perf_counter() - started:.3f}s")
+
+    view = window = all_store = None
+    if Gtk is not None:
+        all_store = Gtk.ListStore(str, int)
+        for i, name in enumerate(names):
+            all_store.append((name, i))
+        view = Gtk.TreeView(model=all_store)
+        view.set_fixed_height_mode(True)
+        column = Gtk.TreeViewColumn("Repository", Gtk.CellRendererText(), text=0)
+        column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        view.append_column(column)
+        if _HAVE_DISPLAY:
+            window = Gtk.Window()
+            scroll = Gtk.ScrolledWindow()
+            scroll.add(view)
+            window.add(scroll)
+            window.set_default_size(400, 400)
+            window.show_all()
+            while Gtk.events_pending():
+                Gtk.main_iteration()
+
+    mode = "search + model + redraw" if _HAVE_DISPLAY else (
+        "search + model" if Gtk is not None else "search only (no GTK)")
+    print(f"measuring: {mode}")
+
+    latencies = []
+    for query in _keystrokes(args.query):
+        started = time.perf_counter()
+        if query:
+            matches = index.search(query, limit=_MAX_MATCHES)
+        if Gtk is not None:
+            if query:
+                store = Gtk.ListStore(str, int)
+                for i in matches:
+                    store.append((names[i], i))
+                view.set_model(store)
+            else:
+                view.set_model(all_store)
+            if _HAVE_DISPLAY:
+                view.queue_draw()
+                while Gtk.events_pending():
+                    Gtk.main_iteration()
+        elapsed = (time.perf_counter() - started) * 1000
+        latencies.append(elapsed)
+        print(f"  {query!r:<12} {elapsed:7.2f} ms")
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"mean {statistics.mean(latencies):.2f} ms, "
+          f"p95 {p95:.2f} ms, max {latencies[-1]:.2f} ms")
+    if window is not None:
+        window.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Cold-start cost of ``ghissue --create``.
+
+Run from the ``desktop`` directory:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --import-budget-ms 60
+
+Each run starts a fresh interpreter with ``-X importtime`` and executes
+the ``--create`` path of ``ghissue.client`` against a scratch config
+directory.  No daemon needs to be running: the client exits with an
+error after failing to reach it, which still covers everything the
+hotkey pays for.  The benchmark fails (exit status 1) if any heavy
+module is imported, or if the median import time or wall time exceeds
+its budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_DESKTOP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Modules the fast path must never load.
+_FORBIDDEN = (
+    "gi.repository.Gtk",
+    "gi.repository.Notify",
+    "gi.repository.Secret",
+    "requests",
+    "ghissue.main",
+    "ghissue.api",
+    "ghissue.queue",
+)
+
+_SCRIPT = (
+    "import sys; sys.argv = ['ghissue', '--create']; "
+    "from ghissue.client import main; main()"
+)
+
+
+def _parse_importtime(stderr: str) -> dict[str, int]:
+    """Return {module: cumulative µs} from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        try:
+            us = int(cumulative)
+        except ValueError:
+            continue  # header line
+        modules[name.strip()] = us
+    return modules
+
+
+def _run_once(env: dict) -> tuple[float, dict[str, int]]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT],
+        cwd=_DESKTOP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if "Traceback" in proc.stderr:
+        # A crash (e.g. gi missing) would make the numbers meaningless.
+        sys.exit(proc.stderr[proc.stderr.index("Traceback"):])
+    return wall, _parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--import-budget-ms", type=float, default=80,
+                        help="median budget for ghissue.client and its imports")
+    parser.add_argument("--wall-budget-ms", type=float, default=250,
+                        help="median budget for the whole process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        config_dir = os.path.join(scratch, "ghissue")
+        os.makedirs(config_dir)
+        with open(os.path.join(config_dir, "config.json"), "w") as f:
+            f.write('{"repos": [{"owner": "octo", "name": "demo"}]}')
+        env = {
+            **os.environ,
+            "XDG_CONFIG_HOME": scratch,
+            # Point the session bus somewhere empty so the call fails fast.
+            "DBUS_SESSION_BUS_ADDRESS": f"unix:path={scratch}/no-bus",
+        }
+
+        walls = []
+        imports = []
+        loaded = set()
+        for _ in range(args.runs):
+            wall, modules = _run_once(env)
+            walls.append(wall * 1000)
+            imports.append(modules.get("ghissue.client", 0) / 1000)
+            loaded.update(modules)
+
+    wall_ms = statistics.median(walls)
+    import_ms = statistics.median(imports)
+    print(f"runs:            {args.runs}")
+    print(f"wall (median):   {wall_ms:7.1f} ms  (budget {args.wall_budget_ms:.0f})")
+    print(f"import (median): {import_ms:7.1f} ms  (budget {args.import_budget_ms:.0f})")
+
+    failures = []
+    heavy = sorted(m for m in loaded
+                   if any(m == f or m.startswith(f + ".") for f in _FORBIDDEN))
+    if heavy:
+        failures.append(f"heavy modules imported: {', '.join(heavy)}")
+    if import_ms > args.import_budget_ms:
+        failures.append("import budget exceeded")
+    if wall_ms > args.wall_budget_ms:
+        failures.append("wall-time budget exceeded")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,52 @@
 """GitHub API client using requests."""
 
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlsplit
 import requests
 
+from .cancel import CancellationToken
+
 _API_BASE = "https://api.github.com"
 _DEVICE_CODE_URL = "https://github.com/login/device/code"
 _OAUTH_TOKEN_URL = "https://github.com/login/oauth/access_token"
+_GRAPHQL_URL = f"{_API_BASE}/graphql"
+
+_REPO_NODES_QUERY = """
+query($owner: String!, $name: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    id
+    labels(first: 100, after: $after) {
+      nodes { id name }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+# Listing pages: items per page, and pages fetched concurrently once the
+# Link header has revealed the last one.
+_PER_PAGE = 100
+_PAGE_WORKERS = 4
+
+# GitHub's secondary limit allows roughly 80 content-creating requests per
+# minute; pace writes a little below that and allow a short burst.
+_WRITE_RATE = 75 / 60
+_WRITE_BURST = 10
+# Backoff after a 403/429 without Retry-After: base * 2**attempt, capped.
+_BACKOFF_BASE = 2.0
+_BACKOFF_MAX = 60.0
+# Give up on a rate-limited request after this many retries, or at once if
+# GitHub asks us to wait longer than _MAX_WAIT seconds.
+_MAX_RETRIES = 3
+_MAX_WAIT = 90.0
+# Seconds to establish a connection, and to wait for each read on it.  A
+# request made with a deadline gets whichever is shorter.
+_CONNECT_TIMEOUT = 5.0
+_READ_TIMEOUT = 30.0
 
 
 @dataclass
@@ -31,6 +72,12 @@ class Label:
     description: str = ""
 
 
+@dataclass
+class LabelPage:
+    etag: str | None
+    labels: list[Label]
+
+
 @dataclass
 class Repo:
     owner: str
@@ -45,6 +92,41 @@ class IssueResponse:
     title: str
 
 
+@dataclass
+class BatchResult:
+    """Outcome of create_issues_batch, keyed by each input's ``id``.
+
+    *kinds* classifies a failure where GitHub said what went wrong: the
+    GraphQL error ``type`` (e.g. ``"NOT_FOUND"``) or the REST status code.
+    """
+    issues: dict[str, IssueResponse] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    kinds: dict[str, str | int] = field(default_factory=dict)
+
+
+@dataclass
+class _RepoNodes:
+    id: str
+    labels: dict[str, str]  # label name → node ID
+
+
+@dataclass
+class RateLimitBudget:
+    limit: int | None = None
+    remaining: int | None = None
+    reset: float | None = None  # epoch seconds when the budget refills
+    blocked_for: float = 0.0  # seconds until requests may resume after a backoff
+    write_tokens: float = 0.0  # content-creation requests available right now
+
+
+class RateLimitedError(requests.HTTPError):
+    """GitHub kept rate limiting the request; retry after *retry_after* seconds."""
+
+    def __init__(self, *args, retry_after: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
 class OAuthPendingError(Exception):
     """Authorization is still pending."""
 
@@ -61,24 +143,232 @@ class OAuthDeniedError(Exception):
     """User denied access."""
 
 
+class RateLimiter:
+    """Paces API requests using GitHub's rate-limit headers.
+
+    Tracks the primary budget of each resource (``core``, ``graphql``,
+    ... as named by ``X-RateLimit-Resource``) from ``X-RateLimit-*``
+    headers and waits for its reset once it is spent.  Content-creating
+    requests also draw from a token bucket sized for the secondary limit.
+    A secondary-limit 403/429 blocks every caller for ``Retry-After``
+    seconds, or an exponential backoff with jitter when GitHub does not
+    say.
+    """
+
+    def __init__(self, write_rate: float = _WRITE_RATE, write_burst: int = _WRITE_BURST):
+        self._lock = threading.Lock()
+        self._write_rate = write_rate
+        self._write_burst = write_burst
+        self._tokens = float(write_burst)
+        self._refilled = time.monotonic()
+        # resource → [limit, remaining, reset]
+        self._budgets: dict[str, list] = {}
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self._write_burst,
+            self._tokens + (now - self._refilled) * self._write_rate,
+        )
+        self._refilled = now
+
+    def _exhausted_for(self, resource: str) -> float:
+        """Seconds until *resource*'s spent primary budget resets, or 0."""
+        _limit, remaining, reset = self._budgets.get(resource, (None, None, None))
+        if remaining is not None and remaining <= 0 and reset:
+            return max(reset - time.time(), 0.0)
+        return 0.0
+
+    def _wait_time(self, writes: int, now: float, resource: str) -> float:
+        wait = max(self._blocked_until - now, self._exhausted_for(resource))
+        # A batch larger than the burst waits for a full bucket and drives
+        # it negative, which holds back the requests after it.
+        need = min(writes, self._write_burst)
+        if writes and self._tokens < need:
+            wait = max(wait, (need - self._tokens) / self._write_rate)
+        return wait
+
+    def acquire(self, writes: int = 0, max_wait: float = _MAX_WAIT,
+                cancel: CancellationToken | None = None,
+                resource: str = "core"):
+        """Block until a request creating *writes* pieces of content may be sent.
+
+        *resource* names the primary budget the request draws from.
+
+        Raises RateLimitedError instead if that would take longer than
+        *max_wait* seconds, and stops waiting if *cancel* fires.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(writes, now, resource)
+                if wait <= 0:
+                    self._tokens -= writes
+                    budget = self._budgets.get(resource)
+                    if budget is not None and budget[1] is not None:
+                        budget[1] -= 1
+                    return
+            if wait > max_wait:
+                raise RateLimitedError(
+                    f"Rate limited for another {wait:.0f}s", retry_after=wait,
+                )
+            if cancel is not None:
+                cancel.sleep(wait)
+            else:
+                time.sleep(wait)
+
+    def update(self, resp: requests.Response):
+        """Record the budget reported by *resp*'s headers."""
+        h = resp.headers
+        try:
+            limit = int(h["X-RateLimit-Limit"])
+            remaining = int(h["X-RateLimit-Remaining"])
+            reset = float(h["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return
+        resource = h.get("X-RateLimit-Resource", "core")
+        with self._lock:
+            self._budgets[resource] = [limit, remaining, reset]
+
+    def back_off(self, resp: requests.Response, attempt: int) -> float:
+        """Block all callers after a rate-limited *resp*. Returns the delay."""
+        delay = None
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+        if delay is None and resp.headers.get("X-RateLimit-Remaining") == "0":
+            # Primary budget spent: update() has recorded its reset for
+            # that resource alone, so other resources are not held back.
+            try:
+                return max(float(resp.headers["X-RateLimit-Reset"]) - time.time(), 0.0)
+            except (KeyError, ValueError):
+                pass
+        if delay is None:
+            delay = min(_BACKOFF_BASE * 2 ** attempt, _BACKOFF_MAX)
+        delay = max(delay, 0.0) + random.uniform(0, min(delay, _BACKOFF_MAX) / 2 + 1)
+        with self._lock:
+            self._blocked_until = max(self._blocked_until,
+                                      time.monotonic() + delay)
+        return delay
+
+    def budget(self, resource: str = "core") -> RateLimitBudget:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            limit, remaining, reset = self._budgets.get(resource, (None, None, None))
+            return RateLimitBudget(
+                limit=limit,
+                remaining=remaining,
+                reset=reset,
+                blocked_for=max(self._blocked_until - now,
+                                self._exhausted_for(resource), 0.0),
+                write_tokens=self._tokens,
+            )
+
+
+def _page_number(url: str) -> int:
+    try:
+        return int(parse_qs(urlsplit(url).query)["page"][0])
+    except (KeyError, ValueError):
+        return 1
+
+
+def _timeout(cancel: CancellationToken | None) -> tuple[float, float]:
+    """Return ``(connect, read)`` timeouts, shortened to *cancel*'s deadline."""
+    connect, read = _CONNECT_TIMEOUT, _READ_TIMEOUT
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+        remaining = cancel.remaining()
+        if remaining is not None:
+            connect = min(connect, remaining)
+            read = min(read, remaining)
+    return connect, read
+
+
+def _is_rate_limited(resp: requests.Response) -> bool:
+    if resp.status_code == 429:
+        return True
+    if resp.status_code != 403:
+        return False
+    if "Retry-After" in resp.headers:
+        return True
+    if resp.headers.get("X-RateLimit-Remaining") == "0":
+        return True
+    return "rate limit" in resp.text.lower()
+
+
 class GitHubAPI:
+    """GitHub REST, GraphQL and OAuth calls over one shared session.
+
+    Every call has connect and read timeouts, and takes an optional
+    CancellationToken: cancel it to abandon the call between requests,
+    or give it a deadline to bound the whole call.
+    """
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             "Accept": "application/json",
             "User-Agent": "ghissue-desktop/1.0",
         })
+        self.rate_limiter = RateLimiter()
+        self._repo_nodes: dict[tuple[str, str], _RepoNodes] = {}
+        self._repo_nodes_lock = threading.Lock()
 
     def _auth_headers(self, token: str) -> dict:
         return {"Authorization": f"token {token}"}
 
+    @property
+    def rate_limit(self) -> RateLimitBudget:
+        """Current rate-limit budget (``core`` resource) as last reported by GitHub."""
+        return self.rate_limiter.budget()
+
+    def _request(self, method: str, url: str, writes: int = 0,
+                 cancel: CancellationToken | None = None,
+                 resource: str = "core", **kwargs):
+        """Send an API request through the rate limiter.
+
+        Rate-limited responses are retried after a backoff; when retries
+        run out, or GitHub asks for too long a wait, RateLimitedError is
+        raised.  Other responses are returned as-is.
+
+        Every request has connect and read timeouts (requests.Timeout).
+        *cancel* is checked before each attempt, raising CancelledError
+        (or DeadlineExceeded once its deadline has passed); its deadline
+        also caps the timeouts and any backoff.  A response that has
+        arrived is never thrown away: a POST may already have created
+        something.
+        """
+        for attempt in range(_MAX_RETRIES + 1):
+            self.rate_limiter.acquire(writes, cancel=cancel, resource=resource)
+            resp = self.session.request(
+                method, url, timeout=_timeout(cancel), **kwargs,
+            )
+            self.rate_limiter.update(resp)
+            if not _is_rate_limited(resp):
+                return resp
+            delay = self.rate_limiter.back_off(resp, attempt)
+            if delay > _MAX_WAIT:
+                break
+        raise RateLimitedError(
+            f"{resp.status_code} rate limited: {url}",
+            response=resp,
+            retry_after=self.rate_limiter.budget(resource).blocked_for,
+        )
+
     # ── OAuth Device Flow ──
 
-    def request_device_code(self, client_id: str) -> DeviceCodeResponse:
+    def request_device_code(
+        self, client_id: str, cancel: CancellationToken | None = None,
+    ) -> DeviceCodeResponse:
         resp = self.session.post(_DEVICE_CODE_URL, json={
             "client_id": client_id,
             "scope": "repo",
-        })
+        }, timeout=_timeout(cancel))
         resp.raise_for_status()
         d = resp.json()
         return DeviceCodeResponse(
@@ -89,12 +379,15 @@ class GitHubAPI:
             interval=d["interval"],
         )
 
-    def poll_for_token(self, client_id: str, device_code: str) -> OAuthTokenResponse:
+    def poll_for_token(
+        self, client_id: str, device_code: str,
+        cancel: CancellationToken | None = None,
+    ) -> OAuthTokenResponse:
         resp = self.session.post(_OAUTH_TOKEN_URL, json={
             "client_id": client_id,
             "device_code": device_code,
             "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
-        })
+        }, timeout=_timeout(cancel))
         resp.raise_for_status()
         d = resp.json()
 
@@ -121,12 +414,16 @@ class GitHubAPI:
     def create_issue(
         self, token: str, owner: str, repo: str,
         title: str, body: str, labels: list[str],
+        cancel: CancellationToken | None = None,
     ) -> IssueResponse:
         payload = {"title": title, "body": body}
         if labels:
             payload["labels"] = labels
-        resp = self.session.post(
+        resp = self._request(
+            "POST",
             f"{_API_BASE}/repos/{owner}/{repo}/issues",
+            writes=1,
+            cancel=cancel,
             json=payload,
             headers=self._auth_headers(token),
         )
@@ -138,51 +435,320 @@ class GitHubAPI:
             title=d["title"],
         )
 
-    def list_labels(self, token: str, owner: str, repo: str) -> list[Label]:
-        labels = []
-        page = 1
+    def list_issues_since(
+        self, token: str, owner: str, repo: str, since: float,
+        cancel: CancellationToken | None = None,
+    ) -> list[tuple[IssueResponse, str]]:
+        """Return ``(issue, body)`` for issues updated at or after *since*.
+
+        *since* is a Unix timestamp; issues in any state are included,
+        pull requests are not.
+        """
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(since))
+        found = []
+        responses = self._iter_pages(
+            f"{_API_BASE}/repos/{owner}/{repo}/issues", token,
+            {"state": "all", "since": stamp}, cancel=cancel,
+        )
+        try:
+            for resp in responses:
+                resp.raise_for_status()
+                for d in resp.json():
+                    if "pull_request" in d:
+                        continue
+                    found.append((
+                        IssueResponse(
+                            number=d["number"],
+                            html_url=d["html_url"],
+                            title=d["title"],
+                        ),
+                        d.get("body") or "",
+                    ))
+        finally:
+            responses.close()
+        return found
+
+    # ── GraphQL ──
+
+    def graphql(self, token: str, query: str, variables: dict,
+                writes: int = 0, cancel: CancellationToken | None = None) -> dict:
+        """Run a GraphQL query; returns the decoded body (``data``/``errors``)."""
+        resp = self._request(
+            "POST",
+            _GRAPHQL_URL,
+            writes=writes,
+            cancel=cancel,
+            resource="graphql",
+            json={"query": query, "variables": variables},
+            headers=self._auth_headers(token),
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def _get_repo_nodes(self, token: str, owner: str, repo: str,
+                        refresh: bool = False,
+                        cancel: CancellationToken | None = None) -> _RepoNodes | None:
+        """Return cached node IDs for a repository and its labels.
+
+        Returns None if the repository cannot be resolved.
+        """
+        key = (owner, repo)
+        with self._repo_nodes_lock:
+            nodes = self._repo_nodes.get(key)
+        if nodes is not None and not refresh:
+            return nodes
+
+        repo_id = None
+        labels = {}
+        after = None
         while True:
-            resp = self.session.get(
-                f"{_API_BASE}/repos/{owner}/{repo}/labels",
-                params={"per_page": 100, "page": page},
-                headers=self._auth_headers(token),
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            if not data:
+            d = self.graphql(token, _REPO_NODES_QUERY, {
+                "owner": owner, "name": repo, "after": after,
+            }, cancel=cancel)
+            r = (d.get("data") or {}).get("repository")
+            if r is None:
+                return None
+            repo_id = r["id"]
+            page = r["labels"]
+            for node in page["nodes"]:
+                labels[node["name"]] = node["id"]
+            if not page["pageInfo"]["hasNextPage"]:
                 break
-            for item in data:
-                labels.append(Label(
-                    name=item["name"],
-                    color=item["color"],
-                    description=item.get("description", ""),
-                ))
-            page += 1
-        return labels
-
-    def list_repos(self, token: str) -> list[Repo]:
-        repos = []
-        page = 1
-        while True:
-            resp = self.session.get(
-                f"{_API_BASE}/user/repos",
-                params={
-                    "per_page": 100,
-                    "page": page,
-                    "sort": "pushed",
-                    "affiliation": "owner,collaborator,organization_member",
-                },
-                headers=self._auth_headers(token),
+            after = page["pageInfo"]["endCursor"]
+
+        nodes = _RepoNodes(id=repo_id, labels=labels)
+        with self._repo_nodes_lock:
+            self._repo_nodes[key] = nodes
+        return nodes
+
+    def create_issues_batch(self, token: str, issues,
+                            cancel: CancellationToken | None = None) -> BatchResult:
+        """Create many issues in one GraphQL request using aliased mutations.
+
+        *issues* are objects with ``id``, ``owner``, ``repo``, ``title``,
+        ``body`` and ``labels`` attributes (e.g. QueuedIssue).  Issues are
+        created in the given order.  Per-issue failures are reported in
+        the result; transport, auth and rate-limit failures raise as for
+        create_issue.  An issue with a label the repository does not have
+        goes through the REST endpoint instead, as before.
+        """
+        result = BatchResult()
+        inputs: dict[str, dict] = {}
+        aliases: dict[str, str] = {}
+
+        def _flush():
+            if inputs:
+                self._run_create_mutation(token, inputs, aliases, result, cancel)
+                inputs.clear()
+                aliases.clear()
+
+        for issue in issues:
+            nodes = self._get_repo_nodes(
+                token, issue.owner, issue.repo, cancel=cancel,
             )
+            if nodes is not None and any(l not in nodes.labels for l in issue.labels):
+                nodes = self._get_repo_nodes(
+                    token, issue.owner, issue.repo, refresh=True, cancel=cancel,
+                )
+            if nodes is None:
+                result.errors[issue.id] = (
+                    f"Could not resolve repository {issue.owner}/{issue.repo}"
+                )
+                result.kinds[issue.id] = "NOT_FOUND"
+            elif any(l not in nodes.labels for l in issue.labels):
+                _flush()
+                try:
+                    result.issues[issue.id] = self.create_issue(
+                        token, issue.owner, issue.repo,
+                        issue.title, issue.body, issue.labels, cancel=cancel,
+                    )
+                except RateLimitedError:
+                    raise
+                except requests.HTTPError as e:
+                    if e.response is not None and e.response.status_code == 401:
+                        raise
+                    result.errors[issue.id] = str(e)
+                    if e.response is not None:
+                        result.kinds[issue.id] = e.response.status_code
+            else:
+                alias = f"i{len(inputs)}"
+                inputs[alias] = {
+                    "repositoryId": nodes.id,
+                    "title": issue.title,
+                    "body": issue.body,
+                    "labelIds": [nodes.labels[l] for l in issue.labels],
+                }
+                aliases[alias] = issue.id
+        _flush()
+        return result
+
+    def _run_create_mutation(self, token: str, inputs: dict[str, dict],
+                             aliases: dict[str, str], result: BatchResult,
+                             cancel: CancellationToken | None):
+        params = ", ".join(f"${a}: CreateIssueInput!" for a in inputs)
+        fields = "\n".join(
+            f"  {a}: createIssue(input: ${a}) {{ issue {{ number url title }} }}"
+            for a in inputs
+        )
+        query = f"mutation({params}) {{\n{fields}\n}}"
+        d = self.graphql(token, query, inputs, writes=len(inputs), cancel=cancel)
+
+        data = d.get("data") or {}
+        errors: dict[str, dict] = {}
+        unattributed = []
+        for err in d.get("errors") or []:
+            if err.get("type") == "RATE_LIMITED" and not any(data.values()):
+                raise RateLimitedError(
+                    err.get("message", "GraphQL rate limited"),
+                    retry_after=self.rate_limiter.budget("graphql").blocked_for,
+                )
+            path = err.get("path") or []
+            if path and path[0] in aliases:
+                errors.setdefault(path[0], err)
+            else:
+                unattributed.append(err.get("message", "error"))
+
+        for alias, issue_id in aliases.items():
+            created = (data.get(alias) or {}).get("issue")
+            if created:
+                result.issues[issue_id] = IssueResponse(
+                    number=created["number"],
+                    html_url=created["url"],
+                    title=created["title"],
+                )
+            elif alias in errors:
+                result.errors[issue_id] = errors[alias].get("message", "error")
+                if errors[alias].get("type"):
+                    result.kinds[issue_id] = errors[alias]["type"]
+            else:
+                result.errors[issue_id] = "; ".join(
+                    unattributed or ["Issue was not created"]
+                )
+
+    def list_labels(self, token: str, owner: str, repo: str,
+                    cancel: CancellationToken | None = None) -> list[Label]:
+        pages, _changed = self.list_label_pages(token, owner, repo, cancel=cancel)
+        return [label for page in pages for label in page.labels]
+
+    def _iter_pages(self, url: str, token: str, params: dict,
+                    etags: list[str | None] | None = None,
+                    last_full: bool = False,
+                    cancel: CancellationToken | None = None):
+        """Yield the responses for every page of a paginated listing, in order.
+
+        The first page's ``Link: rel="last"`` says how many pages there
+        are; the rest are then fetched concurrently over the shared
+        session.  *etags*, if given, are sent as ``If-None-Match`` for the
+        matching pages.  A 304 for the first page may carry no Link
+        header, in which case the cached page count is assumed, plus one
+        page if *last_full* says the last cached page was full and so
+        items may have been added after it.
+        """
+        etags = etags or []
+
+        def _get(page: int) -> requests.Response:
+            headers = self._auth_headers(token)
+            if page <= len(etags) and etags[page - 1]:
+                headers["If-None-Match"] = etags[page - 1]
+            return self._request(
+                "GET", url,
+                cancel=cancel,
+                params={**params, "per_page": _PER_PAGE, "page": page},
+                headers=headers,
+            )
+
+        first = _get(1)
+        yield first
+        if "last" in first.links:
+            last = _page_number(first.links["last"]["url"])
+        elif first.status_code == 304:
+            last = len(etags) + (1 if last_full else 0)
+        else:
+            last = 1
+        if last < 2:
+            return
+
+        pool = ThreadPoolExecutor(max_workers=min(_PAGE_WORKERS, last - 1),
+                                  thread_name_prefix="ghissue-page")
+        try:
+            futures = [pool.submit(_get, page) for page in range(2, last + 1)]
+            for future in futures:
+                yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def list_label_pages(
+        self, token: str, owner: str, repo: str,
+        cached: list[LabelPage] | None = None,
+        cancel: CancellationToken | None = None,
+    ) -> tuple[list[LabelPage], bool]:
+        """Fetch a repository's labels page by page, revalidating *cached*.
+
+        Each page that has a cached ETag is requested with
+        ``If-None-Match``; a 304 reuses the cached page and does not count
+        against the rate limit.  Returns ``(pages, changed)`` where
+        *changed* says whether the result differs from *cached*.
+        """
+        cached = cached or []
+        pages = []
+        changed = False
+        responses = self._iter_pages(
+            f"{_API_BASE}/repos/{owner}/{repo}/labels", token, {},
+            etags=[p.etag for p in cached],
+            last_full=bool(cached) and len(cached[-1].labels) >= _PER_PAGE,
+            cancel=cancel,
+        )
+        for i, resp in enumerate(responses):
+            if resp.status_code == 304 and i < len(cached):
+                pages.append(cached[i])
+                continue
             resp.raise_for_status()
             data = resp.json()
             if not data:
-                break
-            for item in data:
-                repos.append(Repo(
-                    owner=item["owner"]["login"],
-                    name=item["name"],
-                    full_name=item["full_name"],
-                ))
-            page += 1
-        return repos
+                continue
+            changed = True
+            pages.append(LabelPage(
+                etag=resp.headers.get("ETag"),
+                labels=[
+                    Label(
+                        name=item["name"],
+                        color=item["color"],
+                        description=item.get("description") or "",
+                    )
+                    for item in data
+                ],
+            ))
+        if len(pages) != len(cached):
+            changed = True
+        return pages, changed
+
+    def list_repos(self, token: str,
+                   cancel: CancellationToken | None = None) -> list[Repo]:
+        return [repo for page in self.iter_repos(token, cancel) for repo in page]
+
+    def iter_repos(self, token: str, cancel: CancellationToken | None = None):
+        """Yield the user's repositories one page (list of Repo) at a time.
+
+        Pages arrive most recently pushed first.  Closing the generator
+        early cancels the page requests not yet started.
+        """
+        responses = self._iter_pages(
+            f"{_API_BASE}/user/repos", token, {
+                "sort": "pushed",
+                "affiliation": "owner,collaborator,organization_member",
+            },
+            cancel=cancel,
+        )
+        try:
+            for resp in responses:
+                resp.raise_for_status()
+                yield [
+                    Repo(
+                        owner=item["owner"]["login"],
+                        name=item["name"],
+                        full_name=item["full_name"],
+                    )
+                    for item in resp.json()
+                ]
+        finally:
+            responses.close()
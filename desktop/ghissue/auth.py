@@ -1,14 +1,17 @@
 """GitHub Device Flow OAuth helpers."""
 
 import threading
-import time
+
+import requests
 
 from . import api as _api
+from .cancel import CancellationToken, CancelledError
 
 
-def request_code(gh_api: _api.GitHubAPI, client_id: str) -> _api.DeviceCodeResponse:
+def request_code(gh_api: _api.GitHubAPI, client_id: str,
+                 cancel: CancellationToken | None = None) -> _api.DeviceCodeResponse:
     """Request a device code from GitHub. Runs synchronously (call from bg thread)."""
-    return gh_api.request_device_code(client_id)
+    return gh_api.request_device_code(client_id, cancel)
 
 
 def start_polling(
@@ -18,22 +21,27 @@ def start_polling(
     interval: int,
     on_success,   # callable(token: str) — called from bg thread
     on_error,     # callable(msg: str)  — called from bg thread
+    cancel: CancellationToken | None = None,
 ):
     """Poll for the OAuth token in a background thread.
 
     on_success(token) is called once the user authorizes.
     on_error(message) is called on expiry or denial.
+    Cancelling *cancel* stops polling without calling either.
     """
+    cancel = cancel or CancellationToken()
 
     def _poll():
         poll_interval = interval
         while True:
-            time.sleep(poll_interval)
             try:
-                resp = gh_api.poll_for_token(client_id, device_code)
+                cancel.sleep(poll_interval)
+                resp = gh_api.poll_for_token(client_id, device_code, cancel=cancel)
                 on_success(resp.access_token)
                 return
-            except _api.OAuthPendingError:
+            except CancelledError:
+                return
+            except (_api.OAuthPendingError, requests.Timeout):
                 continue
             except _api.OAuthSlowDownError:
                 poll_interval += 5
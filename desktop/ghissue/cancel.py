@@ -0,0 +1,58 @@
+"""Cooperative cancellation for background work."""
+
+import threading
+import time
+
+
+class CancelledError(Exception):
+    """Raised by ``CancellationToken.raise_if_cancelled()``."""
+
+
+class DeadlineExceeded(CancelledError):
+    """The token's deadline passed before the work finished."""
+
+
+class CancellationToken:
+    """A flag shared between whoever starts some work and the work itself.
+
+    The owner calls ``cancel()``, e.g. when a dialog closes; the work
+    checks ``cancelled`` (or calls ``raise_if_cancelled()``) between
+    steps.  A token made with *timeout* also carries a deadline, which
+    bounds how long the work may block.
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self._event = threading.Event()
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline, or None without one."""
+        if self._deadline is None:
+            return None
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    def cancel(self):
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError()
+        if self.expired:
+            raise DeadlineExceeded()
+
+    def sleep(self, seconds: float):
+        """Sleep, raising as soon as the token is cancelled or expires."""
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            self._event.wait(remaining)
+        else:
+            self._event.wait(seconds)
+        self.raise_if_cancelled()
@@ -0,0 +1,539 @@
+"""Command line entry point.
+
+``ghissue --create`` is typically bound to a global hotkey, so this
+module imports only Gio and the config reader: it sends one D-Bus call
+to the running daemon and exits.  Gtk, Notify, requests and the rest of
+the package are only imported when starting the daemon itself, or by
+the subcommands that work on the queue directly.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from gi.repository import Gio, GLib
+
+from . import config
+
+APP_ID = "com.github.ghissue"
+DBUS_PATH = "/com/github/ghissue"
+
+_CALL_TIMEOUT_MS = 5000
+
+
+def send_dbus_call(method, params=None, reply_type=None):
+    """Call *method* on the running daemon; exit with an error if unreachable."""
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        return bus.call_sync(
+            APP_ID,
+            DBUS_PATH,
+            APP_ID,
+            method,
+            params,
+            reply_type,
+            Gio.DBusCallFlags.NONE,
+            _CALL_TIMEOUT_MS,
+            None,
+        )
+    except GLib.Error as e:
+        print(f"ghissue: could not reach daemon: {e.message}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _create():
+    # Use first configured repo
+    repo = config.get_repo(config.load())
+    if not repo:
+        print("ghissue: no repository configured", file=sys.stderr)
+        sys.exit(1)
+    send_dbus_call("CreateIssue", GLib.Variant("(ss)", (repo[0], repo[1])))
+
+
+def _import(args):
+    from .importer import (
+        detect_format, import_issues, read_records, validate,
+    )
+    from .label_cache import LabelCache
+    from .queue import IssueQueue
+
+    fmt = args.format or ("jsonl" if args.file == "-" else detect_format(args.file))
+    if fmt is None:
+        print("ghissue: cannot tell the format of "
+              f"{args.file}; pass --format", file=sys.stderr)
+        sys.exit(2)
+
+    interactive = sys.stderr.isatty()
+
+    def _on_rejected(rejected):
+        if interactive:
+            print(file=sys.stderr)
+        print(f"ghissue: line {rejected.line}: {rejected.reason}", file=sys.stderr)
+
+    def _on_progress(stats):
+        if interactive:
+            print(f"\rghissue: {stats.queued} queued, {stats.rejected} rejected "
+                  f"({stats.read / max(stats.elapsed, 1e-3):.0f} records/s)",
+                  end="", file=sys.stderr, flush=True)
+
+    if args.file == "-":
+        stream = sys.stdin
+    else:
+        try:
+            stream = open(args.file, "r", encoding="utf-8", newline="")
+        except OSError as e:
+            print(f"ghissue: {e}", file=sys.stderr)
+            sys.exit(1)
+    with stream:
+        issues = validate(
+            read_records(stream, fmt), config.load(), LabelCache(),
+            default_repo=args.repo, allow_new_labels=args.allow_new_labels,
+        )
+        stats = import_issues(
+            issues, IssueQueue(), args.batch_size,
+            on_rejected=_on_rejected, on_progress=_on_progress,
+        )
+    if interactive and stats.queued:
+        print(file=sys.stderr)
+    print(f"ghissue: queued {stats.queued} issue(s), rejected {stats.rejected} "
+          f"in {stats.elapsed:.1f} s", file=sys.stderr)
+
+    if args.drain and stats.queued:
+        send_dbus_call("Drain")
+    if stats.rejected:
+        sys.exit(1)
+
+
+# ── Queue inspection ──
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2}
+
+# ghissue queue flush gives up if the daemon is silent this long.
+_FLUSH_IDLE_TIMEOUT = 120
+
+
+def _duration(text: str) -> float:
+    """Parse ``90``, ``45s``, ``30m``, ``2h``, ``7d`` or ``1w`` into seconds."""
+    text = text.strip().lower()
+    unit = text[-1:] if text[-1:] in _UNITS else "s"
+    number = text[:-1] if text[-1:] in _UNITS else text
+    try:
+        return float(number) * _UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a duration: {text}") from None
+
+
+def _size(text: str) -> int:
+    """Parse ``512``, ``64k`` or ``2M`` into bytes."""
+    text = text.strip().lower().removesuffix("b")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a size: {text}") from None
+
+
+def _format_age(seconds: float) -> str:
+    for unit, span in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= span:
+            return f"{seconds / span:.0f}{unit}"
+    return f"{max(seconds, 0):.0f}s"
+
+
+def _format_size(size: int) -> str:
+    if size >= 1024 ** 2:
+        return f"{size / 1024 ** 2:.1f}M"
+    if size >= 1024:
+        return f"{size / 1024:.1f}k"
+    return f"{size}B"
+
+
+def _has_filters(args) -> bool:
+    return bool(args.repo or args.older_than is not None
+                or args.newer_than is not None
+                or args.larger_than is not None
+                or args.smaller_than is not None)
+
+
+def _filtered(entries, args):
+    """Apply the --repo/--older-than/... options to index entries."""
+    now = time.time()
+    repos = set(args.repo or ())
+    for e in entries:
+        age = now - e.timestamp
+        if repos and f"{e.owner}/{e.repo}" not in repos:
+            continue
+        if args.older_than is not None and age < args.older_than:
+            continue
+        if args.newer_than is not None and age > args.newer_than:
+            continue
+        if args.larger_than is not None and e.size <= args.larger_than:
+            continue
+        if args.smaller_than is not None and e.size >= args.smaller_than:
+            continue
+        yield e
+
+
+def _resolve_ids(entries, prefixes) -> list[str]:
+    """Map id prefixes to queued ids; exit if one is unknown or ambiguous."""
+    ids = []
+    for prefix in prefixes:
+        matches = [e.id for e in entries if e.id.startswith(prefix)]
+        if len(matches) != 1:
+            problem = "no queued issue" if not matches else "several queued issues"
+            print(f"ghissue: {problem} with id {prefix}", file=sys.stderr)
+            sys.exit(1)
+        ids.append(matches[0])
+    return ids
+
+
+def _queue_list(queue, args):
+    entries = list(_filtered(queue.entries(), args))
+    if args.limit is not None:
+        entries = entries[:args.limit]
+    by_id = {e.id: e for e in entries}
+    now = time.time()
+    if not args.json:
+        print(f"{'ID':<8}  {'REPOSITORY':<30} {'AGE':>5} {'SIZE':>6} {'TRIES':>5}  TITLE")
+    # Bodies are read one issue at a time and dropped straight away.
+    for issue in queue.iter_issues(by_id):
+        entry = by_id[issue.id]
+        if args.json:
+            print(json.dumps({
+                "id": issue.id, "repo": f"{issue.owner}/{issue.repo}",
+                "title": issue.title, "labels": issue.labels,
+                "timestamp": issue.timestamp, "size": entry.size,
+                "attempts": issue.attempts, "next_due": issue.next_due,
+                "last_error": issue.last_error,
+            }))
+        else:
+            print(f"{issue.id[:8]:<8}  {issue.owner + '/' + issue.repo:<30} "
+                  f"{_format_age(now - issue.timestamp):>5} "
+                  f"{_format_size(entry.size):>6} {issue.attempts:>5}  "
+                  f"{issue.title}")
+
+
+def _queue_stats(queue, args):
+    now = time.time()
+    count = size = waiting = 0
+    oldest = None
+    repos: dict[str, list[int]] = {}
+    for e in _filtered(queue.entries(), args):
+        count += 1
+        size += e.size
+        if e.next_due > now:
+            waiting += 1
+        oldest = e.timestamp if oldest is None else min(oldest, e.timestamp)
+        per_repo = repos.setdefault(f"{e.owner}/{e.repo}", [0, 0])
+        per_repo[0] += 1
+        per_repo[1] += e.size
+    print(f"queued:   {count}")
+    print(f"size:     {_format_size(size)}")
+    print(f"retrying: {waiting} waiting for their next attempt")
+    if oldest is not None:
+        print(f"oldest:   {_format_age(now - oldest)}")
+    for name, (n, nbytes) in sorted(repos.items(), key=lambda r: -r[1][0]):
+        print(f"  {name:<30} {n:>6} {_format_size(nbytes):>7}")
+
+
+def _queue_show(queue, args):
+    ids = _resolve_ids(queue.entries(), args.ids)
+    now = time.time()
+    for n, issue in enumerate(queue.iter_issues(ids)):
+        if n:
+            print()
+        print(f"id:       {issue.id}")
+        print(f"repo:     {issue.owner}/{issue.repo}")
+        print(f"queued:   {time.strftime('%Y-%m-%d %H:%M', time.localtime(issue.timestamp))}"
+              f" ({_format_age(now - issue.timestamp)} ago)")
+        if issue.labels:
+            print(f"labels:   {', '.join(issue.labels)}")
+        if issue.attempts:
+            due = (f"retry in {_format_age(issue.next_due - now)}"
+                   if issue.next_due > now else "retry due")
+            print(f"attempts: {issue.attempts}, {due}")
+            print(f"error:    {issue.last_error}")
+        print(f"title:    {issue.title}")
+        if issue.body:
+            print()
+            print(issue.body)
+
+
+def _queue_drop(queue, args):
+    if not args.ids and not _has_filters(args) and not args.all:
+        print("ghissue: give issue ids, filters or --all", file=sys.stderr)
+        sys.exit(2)
+    entries = queue.entries()
+    if args.ids:
+        wanted = set(_resolve_ids(entries, args.ids))
+        entries = [e for e in entries if e.id in wanted]
+    ids = [e.id for e in _filtered(entries, args)]
+    queue.remove_many(ids)
+    print(f"ghissue: dropped {len(ids)} queued issue(s)", file=sys.stderr)
+
+
+def _queue_dead(queue, args):
+    now = time.time()
+    issues = queue.dead_letters()
+    if not args.json:
+        print(f"{'ID':<8}  {'REPOSITORY':<30} {'AGE':>5} {'TRIES':>5}  TITLE / ERROR")
+    for issue in issues:
+        if args.json:
+            print(json.dumps({
+                "id": issue.id, "repo": f"{issue.owner}/{issue.repo}",
+                "title": issue.title, "labels": issue.labels,
+                "timestamp": issue.timestamp, "attempts": issue.attempts,
+                "last_error": issue.last_error,
+            }))
+        else:
+            print(f"{issue.id[:8]:<8}  {issue.owner + '/' + issue.repo:<30} "
+                  f"{_format_age(now - issue.timestamp):>5} "
+                  f"{issue.attempts:>5}  {issue.title}")
+            print(f"{'':<54}{issue.last_error}")
+
+
+def _dead_ids(queue, args) -> list[str] | None:
+    """Dead letter ids named by *args*, or None for all of them."""
+    if not args.ids and not args.all:
+        print("ghissue: give issue ids or --all", file=sys.stderr)
+        sys.exit(2)
+    if args.all:
+        return None
+    return _resolve_ids(queue.dead_letters(), args.ids)
+
+
+def _queue_requeue(queue, args):
+    n = queue.requeue_dead(_dead_ids(queue, args))
+    print(f"ghissue: re-queued {n} issue(s)", file=sys.stderr)
+    if args.drain and n:
+        send_dbus_call("Drain")
+
+
+def _queue_purge(queue, args):
+    ids = _dead_ids(queue, args)
+    if ids is None:
+        ids = [i.id for i in queue.dead_letters()]
+    queue.drop_dead(ids)
+    print(f"ghissue: deleted {len(ids)} dead letter(s)", file=sys.stderr)
+
+
+def _queue_flush(queue, _args):
+    if queue.count() == 0:
+        print("ghissue: the queue is empty", file=sys.stderr)
+        return
+    interactive = sys.stderr.isatty()
+    loop = GLib.MainLoop()
+    outcome = {}
+    timeout_id = 0
+    ours = None  # sequence number of the drain covering this request
+
+    def _on_timeout():
+        outcome["timeout"] = True
+        loop.quit()
+        return False
+
+    def _arm_timeout():
+        nonlocal timeout_id
+        if timeout_id:
+            GLib.source_remove(timeout_id)
+        timeout_id = GLib.timeout_add_seconds(_FLUSH_IDLE_TIMEOUT, _on_timeout)
+
+    def _on_progress(_conn, _sender, _path, _iface, _signal, params):
+        seq, submitted, deferred, failed, total, finished, reason = params.unpack()
+        # Any drain's progress shows the daemon is busy on our behalf,
+        # even when ours waits for the one in progress.
+        _arm_timeout()
+        if seq != ours:
+            return
+        if finished:
+            outcome.update(submitted=submitted, deferred=deferred,
+                           failed=failed, reason=reason)
+            loop.quit()
+            return
+        if interactive:
+            print(f"\rghissue: {submitted}/{total} submitted, "
+                  f"{deferred} deferred, {failed} failed",
+                  end="", file=sys.stderr, flush=True)
+
+    bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+    # Subscribe before asking, so no progress signal is missed; they are
+    # only dispatched once the loop runs, by when ours is known.
+    bus.signal_subscribe(
+        APP_ID, APP_ID, "DrainProgress", DBUS_PATH, None,
+        Gio.DBusSignalFlags.NONE, _on_progress,
+    )
+    ours = send_dbus_call("Drain", None, GLib.VariantType("(t)")).unpack()[0]
+    _arm_timeout()
+    loop.run()
+    if interactive:
+        print(file=sys.stderr)
+
+    if outcome.get("timeout"):
+        print("ghissue: no word from the daemon for "
+              f"{_FLUSH_IDLE_TIMEOUT} s; gave up waiting", file=sys.stderr)
+        sys.exit(1)
+    print(f"ghissue: {outcome['submitted']} submitted, "
+          f"{outcome['deferred']} deferred, {outcome['failed']} failed",
+          file=sys.stderr)
+    if outcome["reason"]:
+        print(f"ghissue: drain stopped: {outcome['reason']}", file=sys.stderr)
+    if outcome["reason"] or outcome["failed"]:
+        sys.exit(1)
+
+
+def _queue(args):
+    from .queue import IssueQueue
+
+    handlers = {
+        "list": _queue_list,
+        "stats": _queue_stats,
+        "show": _queue_show,
+        "drop": _queue_drop,
+        "flush": _queue_flush,
+        "dead": _queue_dead,
+        "requeue": _queue_requeue,
+        "purge": _queue_purge,
+    }
+    try:
+        handlers[args.action](IssueQueue(), args)
+    except BrokenPipeError:
+        # Piped into something like head, which has exited
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+def _add_queue_filters(parser):
+    parser.add_argument(
+        "--repo", action="append", metavar="OWNER/NAME",
+        help="Only issues for this repository (repeatable)",
+    )
+    parser.add_argument(
+        "--older-than", type=_duration, metavar="AGE",
+        help="Only issues queued longer ago than AGE (e.g. 90s, 30m, 2h, 7d)",
+    )
+    parser.add_argument(
+        "--newer-than", type=_duration, metavar="AGE",
+        help="Only issues queued within AGE",
+    )
+    parser.add_argument(
+        "--larger-than", type=_size, metavar="SIZE",
+        help="Only issues taking more than SIZE (e.g. 512, 64k, 1M)",
+    )
+    parser.add_argument(
+        "--smaller-than", type=_size, metavar="SIZE",
+        help="Only issues taking less than SIZE",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ghissue — quick GitHub issue creator")
+    parser.add_argument(
+        "--create",
+        action="store_true",
+        help="Open the Create Issue dialog on the running daemon and exit",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    import_parser = commands.add_parser(
+        "import", help="Queue issues from a JSONL or CSV file",
+        description="Queue issues from a JSONL or CSV file ('-' for stdin). "
+                    "Each record has a title and optionally body, labels "
+                    "and repo (owner/name).",
+    )
+    import_parser.add_argument("file", help="File to import, or - for stdin")
+    import_parser.add_argument(
+        "--format", choices=("jsonl", "csv"),
+        help="Input format (default: from the file name; jsonl for stdin)",
+    )
+    import_parser.add_argument(
+        "--repo", metavar="OWNER/NAME",
+        help="Repository for records that do not name one",
+    )
+    import_parser.add_argument(
+        "--allow-new-labels", action="store_true",
+        help="Accept labels missing from the cached label list",
+    )
+    import_parser.add_argument(
+        "--batch-size", type=int, default=500, metavar="N",
+        help="Issues written to the queue at a time (default: 500)",
+    )
+    import_parser.add_argument(
+        "--drain", action="store_true",
+        help="Ask the running daemon to submit the queue afterwards",
+    )
+
+    queue_parser = commands.add_parser(
+        "queue", help="Inspect and manage the offline queue",
+        description="Inspect and manage issues waiting in the offline queue.",
+    )
+    actions = queue_parser.add_subparsers(
+        dest="action", metavar="ACTION", required=True,
+    )
+    list_parser = actions.add_parser("list", help="List queued issues")
+    _add_queue_filters(list_parser)
+    list_parser.add_argument("--limit", type=int, metavar="N",
+                             help="Show at most N issues")
+    list_parser.add_argument("--json", action="store_true",
+                             help="One JSON object per line, without bodies")
+    stats_parser = actions.add_parser("stats", help="Summarise the queue")
+    _add_queue_filters(stats_parser)
+    show_parser = actions.add_parser("show", help="Show queued issues in full")
+    show_parser.add_argument("ids", nargs="+", metavar="ID",
+                             help="Issue id or unique prefix")
+    drop_parser = actions.add_parser(
+        "drop", help="Remove issues from the queue without submitting them",
+    )
+    drop_parser.add_argument("ids", nargs="*", metavar="ID",
+                             help="Issue id or unique prefix")
+    _add_queue_filters(drop_parser)
+    drop_parser.add_argument("--all", action="store_true",
+                             help="Drop every matching issue when no ids are given")
+    actions.add_parser(
+        "flush", help="Have the running daemon submit the queue now",
+    )
+    dead_parser = actions.add_parser(
+        "dead", help="List issues set aside after failing for good",
+    )
+    dead_parser.add_argument("--json", action="store_true",
+                             help="One JSON object per line, without bodies")
+    requeue_parser = actions.add_parser(
+        "requeue", help="Put set-aside issues back in the queue",
+    )
+    requeue_parser.add_argument("ids", nargs="*", metavar="ID",
+                                help="Issue id or unique prefix")
+    requeue_parser.add_argument("--all", action="store_true",
+                                help="Re-queue every set-aside issue")
+    requeue_parser.add_argument(
+        "--drain", action="store_true",
+        help="Ask the running daemon to submit the queue afterwards",
+    )
+    purge_parser = actions.add_parser(
+        "purge", help="Delete set-aside issues for good",
+    )
+    purge_parser.add_argument("ids", nargs="*", metavar="ID",
+                              help="Issue id or unique prefix")
+    purge_parser.add_argument("--all", action="store_true",
+                              help="Delete every set-aside issue")
+    args = parser.parse_args()
+
+    if args.create:
+        _create()
+        return
+    if args.command == "import":
+        _import(args)
+        return
+    if args.command == "queue":
+        _queue(args)
+        return
+
+    from .main import run_daemon
+    run_daemon()
+
+
+if __name__ == "__main__":
+    main()
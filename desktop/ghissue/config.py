@@ -124,3 +124,90 @@ def remove_repo(cfg: dict, owner: str, name: str):
         r for r in cfg.get("repos", [])
         if not (r["owner"] == owner and r["name"] == name)
     ]
+
+
+# ── Live config ──
+
+# Coalesce saves arriving within this window (e.g. typing a client ID).
+_SAVE_DELAY_MS = 500
+
+
+def _file_signature():
+    try:
+        st = os.stat(_CONFIG_FILE)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class ConfigStore:
+    """The parsed config, held in memory for the daemon's lifetime.
+
+    ``data`` is the live dict; callers mutate it and call ``save()``,
+    which schedules one atomic write after a short quiet period.
+    ``flush()`` writes any pending change at once.  ``watch()`` reloads
+    ``data`` in place when another process edits the file; pending local
+    changes win over an external edit.  GLib main loop required.
+    """
+
+    def __init__(self):
+        self.data = load()
+        self._signature = _file_signature()
+        self._save_source = 0
+        self._dirty = False
+        self._monitor = None
+        self._listeners = []
+
+    def connect_changed(self, callback):
+        """Call *callback()* after ``data`` is reloaded from disk."""
+        self._listeners.append(callback)
+
+    def watch(self):
+        from gi.repository import Gio
+
+        _ensure_dir()
+        gfile = Gio.File.new_for_path(_CONFIG_FILE)
+        self._monitor = gfile.monitor_file(Gio.FileMonitorFlags.NONE, None)
+        self._monitor.connect("changed", self._on_file_changed)
+
+    def _on_file_changed(self, _monitor, _file, _other, _event):
+        if self._save_source:
+            return
+        signature = _file_signature()
+        if signature == self._signature:
+            return  # our own write, or nothing new
+        self._signature = signature
+        fresh = load()
+        if fresh == self.data:
+            return
+        self.data.clear()
+        self.data.update(fresh)
+        for callback in self._listeners:
+            callback()
+
+    def save(self):
+        """Schedule a write of ``data``."""
+        from gi.repository import GLib
+
+        self._dirty = True
+        if self._save_source:
+            GLib.source_remove(self._save_source)
+        self._save_source = GLib.timeout_add(_SAVE_DELAY_MS, self._on_save_timeout)
+
+    def _on_save_timeout(self):
+        self._save_source = 0
+        self.flush()
+        return False
+
+    def flush(self):
+        """Write pending changes now; does nothing if there are none."""
+        from gi.repository import GLib
+
+        if self._save_source:
+            GLib.source_remove(self._save_source)
+            self._save_source = 0
+        if not self._dirty:
+            return
+        save(self.data)
+        self._dirty = False
+        self._signature = _file_signature()
@@ -1,7 +1,5 @@
 """Create Issue dialog with colored label chips."""
 
-import threading
-
 import gi
 
 gi.require_version("Gtk", "3.0")
@@ -9,35 +7,18 @@ from gi.repository import Gdk, GLib, Gtk
 
 from .. import config
 from ..api import GitHubAPI, Label
-from ..keyring import get_token
+from ..cancel import CancellationToken, DeadlineExceeded
+from ..executor import Priority
+from ..keyring import get_token, get_token_async
 from ..queue import IssueQueue, QueuedIssue
+from .label_style import install_label_styles, style_label_chip
 
 import requests
 
-
-def _label_css(color_hex: str) -> str:
-    """Return CSS for a label toggle button given a hex color (no '#')."""
-    r = int(color_hex[0:2], 16)
-    g = int(color_hex[2:4], 16)
-    b = int(color_hex[4:6], 16)
-    # Perceived luminance
-    lum = (0.299 * r + 0.587 * g + 0.114 * b) / 255
-    fg = "#000000" if lum > 0.5 else "#ffffff"
-    return (
-        f"button.label-chip {{"
-        f"  background: #{color_hex};"
-        f"  color: {fg};"
-        f"  border: none;"
-        f"  border-radius: 12px;"
-        f"  padding: 2px 10px;"
-        f"  min-height: 0;"
-        f"}}"
-        f"button.label-chip:checked {{"
-        f"  background: #{color_hex};"
-        f"  color: {fg};"
-        f"  border: 2px solid {fg};"
-        f"}}"
-    )
+# Longest a submit may take before the dialog gives up waiting.
+_SUBMIT_TIMEOUT = 45
+# Longest the reachability probe may take before the issue is queued.
+_PROBE_TIMEOUT = 1.0
 
 
 class CreateIssueDialog(Gtk.Dialog):
@@ -49,14 +30,15 @@ class CreateIssueDialog(Gtk.Dialog):
         )
         self.set_default_size(520, 480)
         self._app = app
+        self._cancel = CancellationToken()
+        self.connect("destroy", lambda _w: self._cancel.cancel())
         self._owner = owner
         self._repo = repo
         self._labels: list[Label] = []
         self._label_buttons: list[tuple[Gtk.ToggleButton, Label]] = []
 
         # Look up default labels from config
-        cfg = config.load()
-        repo_cfg = config.find_repo(cfg, owner, repo)
+        repo_cfg = config.find_repo(app.cfg, owner, repo)
         self._default_labels = set(
             repo_cfg.get("default_labels", []) if repo_cfg else []
         )
@@ -124,38 +106,53 @@ class CreateIssueDialog(Gtk.Dialog):
         self._fetch_labels()
 
     def _fetch_labels(self):
-        token = get_token()
+        get_token_async(self._fetch_labels_with_token)
+
+    def _fetch_labels_with_token(self, token):
         if not token:
             self._labels_header.hide()
             return
 
-        self._labels_spinner.show()
-        self._labels_spinner.start()
+        # Render cached chips at once, then revalidate in the background
+        cached = self._app.labels.get(self._owner, self._repo)
+        if cached is not None:
+            self._labels = cached
+            self._populate_labels()
+        else:
+            self._labels_spinner.show()
+            self._labels_spinner.start()
 
         def _fetch():
-            return self._app.api.list_labels(token, self._owner, self._repo)
+            return self._app.labels.refresh(
+                self._app.api, token, self._owner, self._repo, self._cancel,
+            )
 
-        def _on_labels(labels):
+        def _on_labels(result):
+            labels, changed = result
             self._labels_spinner.stop()
             self._labels_spinner.hide()
+            if not changed:
+                return
+            selected = set(self._get_selected_labels()) if cached is not None else None
             self._labels = labels
-            self._populate_labels()
+            self._populate_labels(selected)
 
-        def _on_error(msg):
+        def _on_error(_exc):
             self._labels_spinner.stop()
             self._labels_spinner.hide()
-            self._labels_header.set_text(f"Labels: (failed to load)")
+            if cached is None:
+                self._labels_header.set_text(f"Labels: (failed to load)")
 
-        def _run():
-            try:
-                labels = _fetch()
-                GLib.idle_add(_on_labels, labels)
-            except Exception as e:
-                GLib.idle_add(_on_error, str(e))
+        self._app.executor.submit(
+            _fetch, priority=Priority.PREFETCH,
+            on_done=_on_labels, on_error=_on_error, cancel=self._cancel,
+        )
 
-        threading.Thread(target=_run, daemon=True).start()
+    def _populate_labels(self, selected: set[str] | None = None):
+        """Build the chips; *selected* overrides the default selection."""
+        if selected is None:
+            selected = self._default_labels
 
-    def _populate_labels(self):
         # Clear existing
         for child in self._labels_flow.get_children():
             self._labels_flow.remove(child)
@@ -169,22 +166,16 @@ class CreateIssueDialog(Gtk.Dialog):
         self._labels_header.show()
         self._labels_flow.show()
 
+        install_label_styles(self._owner, self._repo, self._labels)
+
         for label in self._labels:
             btn = Gtk.ToggleButton(label=label.name)
-            btn.get_style_context().add_class("label-chip")
+            style_label_chip(btn, label.color)
 
-            # Pre-select default labels
-            if label.name in self._default_labels:
+            # Pre-select default (or previously chosen) labels
+            if label.name in selected:
                 btn.set_active(True)
 
-            # Apply per-label color via CSS provider
-            css = _label_css(label.color)
-            provider = Gtk.CssProvider()
-            provider.load_from_data(css.encode())
-            btn.get_style_context().add_provider(
-                provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-            )
-
             self._label_buttons.append((btn, label))
             self._labels_flow.add(btn)
 
@@ -218,12 +209,6 @@ class CreateIssueDialog(Gtk.Dialog):
         body = buf.get_text(buf.get_start_iter(), buf.get_end_iter(), True).strip()
         labels = self._get_selected_labels()
 
-        token = get_token()
-        if not token:
-            self._show_error("Not logged in.")
-            dialog.stop_emission_by_name("response")
-            return
-
         owner = self._owner
         name = self._repo
 
@@ -234,22 +219,45 @@ class CreateIssueDialog(Gtk.Dialog):
         # Stop the dialog from closing
         dialog.stop_emission_by_name("response")
 
+        def _enqueue():
+            issue = QueuedIssue(
+                title=title, body=body, labels=labels,
+                owner=owner, repo=name,
+            )
+            self._app.queue.enqueue(issue)
+            n = self._app.queue.count()
+            GLib.idle_add(self._on_submit_queued, n)
+
         def _submit():
+            # Looked up here, off the main thread, in case the cache is cold
+            token = get_token()
+            if not token:
+                GLib.idle_add(self._on_submit_error, "Not logged in.")
+                return
+            # Offline: queue now rather than wait for the connect to fail
+            net = self._app.net
+            if net is not None and not net.can_reach_api(_PROBE_TIMEOUT):
+                _enqueue()
+                return
             try:
-                result = self._app.api.create_issue(token, owner, name, title, body, labels)
+                result = self._app.api.create_issue(
+                    token, owner, name, title, body, labels,
+                    cancel=CancellationToken(timeout=_SUBMIT_TIMEOUT),
+                )
                 GLib.idle_add(self._on_submit_success, result)
             except requests.ConnectionError:
-                issue = QueuedIssue(
-                    title=title, body=body, labels=labels,
-                    owner=owner, repo=name,
+                _enqueue()
+            except (requests.Timeout, DeadlineExceeded):
+                # The request got out, so it may have worked: don't queue.
+                GLib.idle_add(
+                    self._on_submit_error,
+                    "GitHub did not respond in time. Check the repository "
+                    "before submitting again.",
                 )
-                self._app.queue.enqueue(issue)
-                n = self._app.queue.count()
-                GLib.idle_add(self._on_submit_queued, n)
             except Exception as e:
                 GLib.idle_add(self._on_submit_error, str(e))
 
-        threading.Thread(target=_submit, daemon=True).start()
+        self._app.executor.submit(_submit, priority=Priority.INTERACTIVE)
 
     def _on_submit_success(self, result):
         self._app._notify("Issue created", f"#{result.number}: {result.title}")
@@ -257,6 +265,9 @@ class CreateIssueDialog(Gtk.Dialog):
 
     def _on_submit_queued(self, n):
         self._app._notify("Issue queued", f"Issue queued ({n} pending)")
+        # The probe may have been wrong with no network change to follow;
+        # the coordinator probes again before draining.
+        self._app.drainer.request()
         self.response(Gtk.ResponseType.CLOSE)
 
     def _on_submit_error(self, msg):
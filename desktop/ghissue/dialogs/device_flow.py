@@ -11,6 +11,7 @@ from gi.repository import Gdk, GLib, Gtk
 
 from .. import auth
 from ..api import DeviceCodeResponse
+from ..cancel import CancellationToken
 
 
 class DeviceFlowDialog(Gtk.Dialog):
@@ -29,6 +30,8 @@ class DeviceFlowDialog(Gtk.Dialog):
         self._app = app
         self._resp = device_code_resp
         self._token = None
+        self._cancel = CancellationToken()
+        self.connect("destroy", lambda _w: self._cancel.cancel())
 
         box = self.get_content_area()
         box.set_spacing(12)
@@ -87,6 +90,7 @@ class DeviceFlowDialog(Gtk.Dialog):
             interval=self._resp.interval,
             on_success=self._on_auth_success,
             on_error=self._on_auth_error,
+            cancel=self._cancel,
         )
 
     @property
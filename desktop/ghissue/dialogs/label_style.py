@@ -0,0 +1,88 @@
+"""Shared stylesheets for colored label chips."""
+
+import functools
+import re
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gdk", "3.0")
+from gi.repository import Gdk, Gtk
+
+_HEX_COLOR = re.compile(r"[0-9a-f]{6}")
+
+# (owner, repo) → (colors covered, provider installed on the screen)
+_providers: dict[tuple[str, str], tuple[frozenset[str], Gtk.CssProvider]] = {}
+
+
+def _chip_class(color_hex: str) -> str:
+    return f"label-chip-{color_hex}"
+
+
+@functools.lru_cache(maxsize=None)
+def _chip_css(color_hex: str) -> str:
+    """Return CSS for label chips of one hex color (no '#')."""
+    r = int(color_hex[0:2], 16)
+    g = int(color_hex[2:4], 16)
+    b = int(color_hex[4:6], 16)
+    # Perceived luminance
+    lum = (0.299 * r + 0.587 * g + 0.114 * b) / 255
+    fg = "#000000" if lum > 0.5 else "#ffffff"
+    cls = _chip_class(color_hex)
+    return (
+        f"button.label-chip.{cls} {{"
+        f"  background: #{color_hex};"
+        f"  color: {fg};"
+        f"  border: none;"
+        f"  border-radius: 12px;"
+        f"  padding: 2px 10px;"
+        f"  min-height: 0;"
+        f"}}"
+        f"button.label-chip.{cls}:checked {{"
+        f"  background: #{color_hex};"
+        f"  color: {fg};"
+        f"  border: 2px solid {fg};"
+        f"}}"
+    )
+
+
+def _normalize(color_hex: str) -> str | None:
+    color_hex = color_hex.lower()
+    return color_hex if _HEX_COLOR.fullmatch(color_hex) else None
+
+
+def install_label_styles(owner: str, repo: str, labels):
+    """Make chip styles for *labels* available on the default screen.
+
+    One stylesheet per repository, with a class per label color.  It is
+    kept across dialogs and only regenerated when the repository's set
+    of label colors changes.
+    """
+    colors = frozenset(
+        c for c in (_normalize(label.color) for label in labels) if c
+    )
+    key = (owner, repo)
+    screen = Gdk.Screen.get_default()
+    installed = _providers.get(key)
+    if installed is not None:
+        if installed[0] == colors:
+            return
+        Gtk.StyleContext.remove_provider_for_screen(screen, installed[1])
+
+    provider = Gtk.CssProvider()
+    provider.load_from_data(
+        "".join(_chip_css(c) for c in sorted(colors)).encode()
+    )
+    Gtk.StyleContext.add_provider_for_screen(
+        screen, provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+    )
+    _providers[key] = (colors, provider)
+
+
+def style_label_chip(button: Gtk.ToggleButton, color_hex: str):
+    """Give *button* the chip classes for *color_hex*."""
+    ctx = button.get_style_context()
+    ctx.add_class("label-chip")
+    color_hex = _normalize(color_hex)
+    if color_hex:
+        ctx.add_class(_chip_class(color_hex))
@@ -1,7 +1,5 @@
 """Settings dialog: client ID, login, multi-repo management."""
 
-import threading
-
 import gi
 
 gi.require_version("Gtk", "3.0")
@@ -9,9 +7,16 @@ from gi.repository import Gdk, GLib, Gtk
 
 from .. import config
 from ..api import GitHubAPI
-from ..keyring import clear_token, get_token, is_logged_in, store_token
-from ..main import run_in_background
+from ..cancel import CancellationToken
+from ..executor import Priority
+from ..fuzzy import FuzzyIndex
+from ..keyring import clear_token, get_token_async, store_token
 from .device_flow import DeviceFlowDialog
+from .label_style import install_label_styles, style_label_chip
+
+# Repository picker: pause before refiltering, and most matches listed.
+_FILTER_DELAY_MS = 80
+_MAX_MATCHES = 500
 
 
 class SettingsDialog(Gtk.Dialog):
@@ -24,7 +29,10 @@ class SettingsDialog(Gtk.Dialog):
         self.set_default_size(460, -1)
         self.set_resizable(False)
         self._app = app
-        self._cfg = config.load()
+        self._cfg = app.cfg
+        self._cancel = CancellationToken()
+        self.connect("destroy", lambda _w: self._cancel.cancel())
+        self._logged_in = False
 
         box = self.get_content_area()
         box.set_spacing(10)
@@ -74,21 +82,25 @@ class SettingsDialog(Gtk.Dialog):
 
     def _on_client_id_changed(self, entry):
         self._cfg["client_id"] = entry.get_text().strip()
-        config.save(self._cfg)
+        self._app.config_store.save()
 
     # ── Login ──
 
     def _update_login_ui(self):
-        if is_logged_in():
+        get_token_async(self._apply_login_state)
+
+    def _apply_login_state(self, token):
+        self._logged_in = token is not None
+        if self._logged_in:
             self._login_label.set_text("Status: Logged in")
             self._login_btn.set_label("Logout")
         else:
             self._login_label.set_text("Status: Not logged in")
             self._login_btn.set_label("Login")
-        self._add_repo_btn.set_sensitive(is_logged_in())
+        self._add_repo_btn.set_sensitive(self._logged_in)
 
     def _on_login_toggle(self, _btn):
-        if is_logged_in():
+        if self._logged_in:
             clear_token()
             self._update_login_ui()
         else:
@@ -104,7 +116,7 @@ class SettingsDialog(Gtk.Dialog):
         self._login_btn.set_label("Requesting code...")
 
         def _request():
-            return self._app.api.request_device_code(client_id)
+            return self._app.api.request_device_code(client_id, self._cancel)
 
         def _on_code(resp):
             self._login_btn.set_sensitive(True)
@@ -117,14 +129,12 @@ class SettingsDialog(Gtk.Dialog):
                 store_token(token)
             self._update_login_ui()
 
-        def _request_and_callback():
-            try:
-                resp = _request()
-                GLib.idle_add(_on_code, resp)
-            except Exception as e:
-                GLib.idle_add(self._on_login_request_error, str(e))
-
-        threading.Thread(target=_request_and_callback, daemon=True).start()
+        self._app.executor.submit(
+            _request,
+            on_done=_on_code,
+            on_error=lambda e: self._on_login_request_error(str(e)),
+            cancel=self._cancel,
+        )
 
     def _on_login_request_error(self, msg):
         self._login_btn.set_sensitive(True)
@@ -200,40 +210,15 @@ class SettingsDialog(Gtk.Dialog):
         return row
 
     def _on_add_repo(self, _btn):
-        token = get_token()
+        get_token_async(self._on_add_repo_token)
+
+    def _on_add_repo_token(self, token):
         if not token:
             self._show_error("Please log in first.")
             return
+        self._show_repo_picker(token)
 
-        self._add_repo_btn.set_sensitive(False)
-        self._add_repo_btn.set_label("Loading...")
-
-        def _fetch():
-            return self._app.api.list_repos(token)
-
-        def _on_repos(repos):
-            self._add_repo_btn.set_sensitive(True)
-            self._add_repo_btn.set_label("Add Repository...")
-            if not repos:
-                self._show_error("No repositories found.")
-                return
-            self._show_repo_picker(repos)
-
-        def _fetch_and_callback():
-            try:
-                repos = _fetch()
-                GLib.idle_add(_on_repos, repos)
-            except Exception as e:
-                GLib.idle_add(self._on_repo_fetch_error, str(e))
-
-        threading.Thread(target=_fetch_and_callback, daemon=True).start()
-
-    def _on_repo_fetch_error(self, msg):
-        self._add_repo_btn.set_sensitive(True)
-        self._add_repo_btn.set_label("Add Repository...")
-        self._show_error(f"Failed to load repositories:\n{msg}")
-
-    def _show_repo_picker(self, repos):
+    def _show_repo_picker(self, token):
         dlg = Gtk.Dialog(
             title="Select Repository",
             transient_for=self,
@@ -248,62 +233,126 @@ class SettingsDialog(Gtk.Dialog):
         search.set_placeholder_text("Filter repositories...")
         box.add(search)
 
+        # A TreeView renders only the visible rows, so the list stays fast
+        # with tens of thousands of repositories.  Columns: name, position
+        # in *repos*.
+        all_store = Gtk.ListStore(str, int)
+        view = Gtk.TreeView(model=all_store)
+        view.set_headers_visible(False)
+        view.set_enable_search(False)
+        view.set_fixed_height_mode(True)
+        renderer = Gtk.CellRendererText()
+        renderer.set_padding(8, 4)
+        column = Gtk.TreeViewColumn("Repository", renderer, text=0)
+        column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        view.append_column(column)
+        view.connect(
+            "row-activated",
+            lambda *_a: dlg.response(Gtk.ResponseType.OK),
+        )
+
         scroll = Gtk.ScrolledWindow()
         scroll.set_vexpand(True)
-        listbox = Gtk.ListBox()
-        listbox.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        scroll.add(listbox)
+        scroll.add(view)
         box.add(scroll)
 
-        rows = []
-        for repo in repos:
-            # Skip already-configured repos
-            if config.find_repo(self._cfg, repo.owner, repo.name):
-                continue
-            row = Gtk.ListBoxRow()
-            lbl = Gtk.Label(label=repo.full_name, xalign=0)
-            lbl.set_margin_start(8)
-            lbl.set_margin_end(8)
-            lbl.set_margin_top(4)
-            lbl.set_margin_bottom(4)
-            row.add(lbl)
-            row._repo = repo
-            listbox.add(row)
-            rows.append((row, repo.full_name.lower()))
+        status = Gtk.Label(label="Loading...", xalign=0)
+        status.set_margin_start(8)
+        status.set_sensitive(False)
+        box.add(status)
+
+        configured = {(r["owner"], r["name"]) for r in config.get_repos(self._cfg)}
+        repos = []
+        index = FuzzyIndex()
+        cancel = CancellationToken()
+        pending = {"source": 0}
+
+        def _apply_filter():
+            pending["source"] = 0
+            query = search.get_text().strip()
+            if not query:
+                view.set_model(all_store)
+                return False
+            matches = Gtk.ListStore(str, int)
+            for i in index.search(query, limit=_MAX_MATCHES):
+                matches.append((repos[i].full_name, i))
+            view.set_model(matches)
+            return False
+
+        def _schedule_filter(*_args):
+            # Debounce: refilter once typing (or page arrival) pauses.
+            if pending["source"]:
+                GLib.source_remove(pending["source"])
+            pending["source"] = GLib.timeout_add(_FILTER_DELAY_MS, _apply_filter)
+
+        def _add_page(page):
+            if cancel.cancelled:
+                return
+            for repo in page:
+                # Skip already-configured repos
+                if (repo.owner, repo.name) in configured:
+                    continue
+                all_store.append((repo.full_name, len(repos)))
+                repos.append(repo)
+                index.add(repo.full_name)
+            status.set_text(f"Loading... ({len(repos)} so far)")
+            if search.get_text().strip():
+                _schedule_filter()
+
+        def _on_done(error):
+            if error:
+                status.set_text(f"Failed to load repositories: {error}")
+            elif not repos:
+                status.set_text("No repositories found.")
+            else:
+                status.hide()
 
-        def _filter(entry):
-            text = entry.get_text().lower()
-            for row, name in rows:
-                row.set_visible(text in name)
+        def _fetch():
+            error = None
+            pages = self._app.api.iter_repos(token, cancel)
+            try:
+                for page in pages:
+                    if cancel.cancelled:
+                        break
+                    GLib.idle_add(_add_page, page)
+            except Exception as e:
+                error = str(e)
+            finally:
+                pages.close()
+            return error
 
-        search.connect("search-changed", _filter)
+        search.connect("changed", _schedule_filter)
 
         dlg.add_button("Cancel", Gtk.ResponseType.CANCEL)
         dlg.add_button("Add", Gtk.ResponseType.OK)
 
         dlg.show_all()
+        self._app.executor.submit(_fetch, on_done=_on_done, cancel=cancel)
         result = dlg.run()
+        cancel.cancel()
+        if pending["source"]:
+            GLib.source_remove(pending["source"])
 
         if result == Gtk.ResponseType.OK:
-            selected = listbox.get_selected_row()
-            if selected:
-                repo = selected._repo
+            model, it = view.get_selection().get_selected()
+            if it is not None:
+                repo = repos[model[it][1]]
                 config.add_repo(self._cfg, repo.owner, repo.name)
-                config.save(self._cfg)
+                self._app.config_store.save()
                 self._rebuild_repo_list()
 
         dlg.destroy()
 
     def _on_remove_repo(self, repo):
         config.remove_repo(self._cfg, repo["owner"], repo["name"])
-        config.save(self._cfg)
+        self._app.config_store.save()
         self._rebuild_repo_list()
 
     def _on_configure_repo(self, repo):
         dlg = RepoConfigDialog(self, self._app, repo)
         dlg.run()
         dlg.destroy()
-        config.save(self._cfg)
+        self._app.config_store.save()
         self._rebuild_repo_list()
 
     # ── Helpers ──
@@ -333,6 +382,8 @@ class RepoConfigDialog(Gtk.Dialog):
         self.set_resizable(False)
         self._app = app
         self._repo = repo
+        self._cancel = CancellationToken()
+        self.connect("destroy", lambda _w: self._cancel.cancel())
 
         box = self.get_content_area()
         box.set_spacing(10)
@@ -412,36 +463,43 @@ class RepoConfigDialog(Gtk.Dialog):
         self._repo["color"] = color
 
     def _fetch_labels(self):
-        token = get_token()
+        get_token_async(self._fetch_labels_with_token)
+
+    def _fetch_labels_with_token(self, token):
         if not token:
             return
 
-        self._labels_spinner.show()
-        self._labels_spinner.start()
-
         owner = self._repo["owner"]
         name = self._repo["name"]
 
+        # Render cached chips at once, then revalidate in the background
+        cached = self._app.labels.get(owner, name)
+        if cached is not None:
+            self._populate_labels(cached)
+        else:
+            self._labels_spinner.show()
+            self._labels_spinner.start()
+
         def _fetch():
-            return self._app.api.list_labels(token, owner, name)
+            return self._app.labels.refresh(
+                self._app.api, token, owner, name, self._cancel,
+            )
 
-        def _on_labels(labels):
+        def _on_labels(result):
+            labels, changed = result
             self._labels_spinner.stop()
             self._labels_spinner.hide()
-            self._populate_labels(labels)
+            if changed:
+                self._populate_labels(labels)
 
-        def _on_error(msg):
+        def _on_error(_exc):
             self._labels_spinner.stop()
             self._labels_spinner.hide()
 
-        def _run():
-            try:
-                labels = _fetch()
-                GLib.idle_add(_on_labels, labels)
-            except Exception as e:
-                GLib.idle_add(_on_error, str(e))
-
-        threading.Thread(target=_run, daemon=True).start()
+        self._app.executor.submit(
+            _fetch, priority=Priority.PREFETCH,
+            on_done=_on_labels, on_error=_on_error, cancel=self._cancel,
+        )
 
     def _populate_labels(self, labels):
         for child in self._labels_flow.get_children():
@@ -453,34 +511,12 @@ class RepoConfigDialog(Gtk.Dialog):
             return
 
         defaults = set(self._repo.get("default_labels", []))
+        install_label_styles(self._repo["owner"], self._repo["name"], labels)
 
         for label in labels:
             btn = Gtk.ToggleButton(label=label.name)
             btn.set_active(label.name in defaults)
-            btn.get_style_context().add_class("label-chip")
-
-            # Per-label color CSS
-            r = int(label.color[0:2], 16)
-            g = int(label.color[2:4], 16)
-            b = int(label.color[4:6], 16)
-            lum = (0.299 * r + 0.587 * g + 0.114 * b) / 255
-            fg = "#000000" if lum > 0.5 else "#ffffff"
-            css = (
-                f"button.label-chip {{"
-                f"  background: #{label.color}; color: {fg};"
-                f"  border: none; border-radius: 12px;"
-                f"  padding: 2px 10px; min-height: 0;"
-                f"}}"
-                f"button.label-chip:checked {{"
-                f"  background: #{label.color}; color: {fg};"
-                f"  border: 2px solid {fg};"
-                f"}}"
-            )
-            provider = Gtk.CssProvider()
-            provider.load_from_data(css.encode())
-            btn.get_style_context().add_provider(
-                provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-            )
+            style_label_chip(btn, label.color)
 
             btn.connect("toggled", self._on_label_toggled)
             self._label_buttons.append((btn, label.name))
@@ -0,0 +1,200 @@
+"""Single-flight scheduling of queue drains."""
+
+import logging
+import math
+import time
+
+from gi.repository import Gio, GLib
+
+from .cancel import CancellationToken
+from .executor import Priority
+from .keyring import get_token
+from .network import api_address
+from .queue import DrainResult
+
+_log = logging.getLogger(__name__)
+
+# Wait for network-changed signals to settle before draining.
+_NETWORK_SETTLE_MS = 2000
+
+
+class DrainCoordinator:
+    """Makes sure at most one drain runs at a time.
+
+    ``request()`` starts a drain unless one is already running, in
+    which case exactly one follow-up drain runs after the current one
+    finishes, however many requests arrive meanwhile.  Network changes
+    go through ``network_changed()``, which waits for the signals to
+    settle first.  Before each drain, GitHub's API host is probed with
+    ``Gio.NetworkMonitor.can_reach_async``; if it is unreachable, the
+    drain is skipped until the next trigger.  After each drain a single
+    timeout is armed for the earliest queued retry, or for when a rate
+    limit lifts or a stalled repository may be tried again, so nothing
+    waits for the next network change.
+
+    Main thread only.  *on_drained(result)* receives the DrainResult of
+    every completed drain.
+
+    Each attempt has a sequence number, which ``request()`` returns.
+    *on_progress(seq, totals, finished)* receives the running totals
+    after each batch, then once with *finished* set when the attempt
+    ends.  Every attempt gets that final call, including attempts that
+    never got to submit (``stopped_reason`` "network", "auth" or
+    "error") and requests that found the queue empty.
+    """
+
+    def __init__(self, queue, get_api, executor, on_drained=None,
+                 on_progress=None):
+        self._queue = queue
+        self._get_api = get_api
+        self._executor = executor
+        self._on_drained = on_drained
+        self._on_progress = on_progress
+        self._monitor = None  # looked up on first use, after startup
+        self._address = api_address()
+        self._busy = False  # probing or draining
+        self._again = False
+        self._seq = 0  # of the current or last attempt
+        self._settle_source = 0
+        self._retry_source = 0
+        self._probe_cancel = None
+        self._drain_cancel = None
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    def network_changed(self):
+        """Request a drain once network changes stop for a moment."""
+        if self._settle_source:
+            GLib.source_remove(self._settle_source)
+        self._settle_source = GLib.timeout_add(
+            _NETWORK_SETTLE_MS, self._on_network_settled,
+        )
+
+    def _on_network_settled(self):
+        self._settle_source = 0
+        self.request()
+        return False
+
+    def request(self) -> int:
+        """Drain now, or once more after the drain in progress.
+
+        Returns the sequence number of the attempt that will cover this
+        request.
+        """
+        if self._busy:
+            self._again = True
+            return self._seq + 1
+        self._seq += 1
+        if self._queue.count() == 0:
+            if self._on_progress is not None:
+                GLib.idle_add(self._on_progress, self._seq, DrainResult(), True)
+            return self._seq
+        self._busy = True
+        self._again = False
+        if self._monitor is None:
+            self._monitor = Gio.NetworkMonitor.get_default()
+        self._probe_cancel = Gio.Cancellable()
+        self._monitor.can_reach_async(
+            self._address, self._probe_cancel, self._on_probed,
+        )
+        return self._seq
+
+    def _on_probed(self, monitor, result):
+        self._probe_cancel = None
+        try:
+            reachable = monitor.can_reach_finish(result)
+        except GLib.Error as e:
+            _log.info("drain: %s unreachable (%s)",
+                      self._address.get_hostname(), e.message)
+            reachable = False
+        if not reachable:
+            self._finish(DrainResult(stopped_reason="network"))
+            return
+        self._drain_cancel = CancellationToken()
+        self._executor.submit(
+            self._drain, self._seq, self._drain_cancel,
+            priority=Priority.DRAIN,
+            on_done=self._on_done,
+            on_error=self._on_error,
+        )
+
+    def _drain(self, seq: int, cancel: CancellationToken):
+        token = get_token()
+        if not token:
+            return None
+
+        def _progress(totals):
+            if self._on_progress is not None:
+                GLib.idle_add(self._on_progress, seq, totals, False)
+
+        return self._queue.drain(
+            self._get_api(), token, cancel=cancel, on_progress=_progress,
+        )
+
+    def _on_done(self, result):
+        if result is None:
+            self._finish(DrainResult(stopped_reason="auth"))
+            return
+        _log.info("drain: %d submitted, %d deferred, %d failed, "
+                  "stopped: %s (%.1f s)",
+                  result.submitted, result.deferred, result.failed,
+                  result.stopped_reason, result.elapsed)
+        if self._on_drained is not None:
+            self._on_drained(result)
+        self._finish(result)
+
+    def _on_error(self, exc):
+        _log.error("drain failed: %s", exc)
+        self._finish(DrainResult(stopped_reason="error"))
+
+    def _finish(self, result: DrainResult):
+        if self._on_progress is not None:
+            self._on_progress(self._seq, result, True)
+        self._busy = False
+        self._drain_cancel = None
+        if self._again:
+            self.request()
+        else:
+            self._arm_retry(result.retry_after)
+
+    def _arm_retry(self, retry_after: float | None = None):
+        """Arm one timeout for the earliest queued retry or *retry_after*."""
+        if self._retry_source:
+            GLib.source_remove(self._retry_source)
+            self._retry_source = 0
+        delays = []
+        due = self._queue.next_retry_at()
+        if due is not None:
+            delays.append(due - time.time())
+        if retry_after is not None:
+            delays.append(retry_after)
+        if not delays:
+            return
+        delay = max(1, math.ceil(min(delays)))
+        self._retry_source = GLib.timeout_add_seconds(delay, self._on_retry_due)
+
+    def _on_retry_due(self):
+        self._retry_source = 0
+        self.request()
+        return False
+
+    def stop(self):
+        """Drop pending triggers and cancel a drain in progress."""
+        if self._settle_source:
+            GLib.source_remove(self._settle_source)
+            self._settle_source = 0
+        if self._retry_source:
+            GLib.source_remove(self._retry_source)
+            self._retry_source = 0
+        if self._probe_cancel is not None:
+            self._probe_cancel.cancel()
+        if self._drain_cancel is not None:
+            self._drain_cancel.cancel()
+        if self._again and self._on_progress is not None:
+            # The promised follow-up will not run
+            self._on_progress(
+                self._seq + 1, DrainResult(stopped_reason="cancelled"), True,
+            )
+        self._again = False
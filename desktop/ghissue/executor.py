@@ -0,0 +1,183 @@
+"""Shared, bounded, prioritised pool for background work."""
+
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from gi.repository import GLib
+
+from .cancel import CancellationToken
+
+_log = logging.getLogger(__name__)
+
+_MAX_WORKERS = 4
+
+
+class Priority(IntEnum):
+    """Lower runs first."""
+    INTERACTIVE = 0  # the user is waiting: submit, login, repo list
+    PREFETCH = 1     # nice to have soon: label refresh
+    DRAIN = 2        # queue draining
+
+
+@dataclass
+class ExecutorStats:
+    queued: dict[str, int] = field(default_factory=dict)  # by priority name
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+
+
+@dataclass(order=True)
+class _Task:
+    priority: int
+    seq: int
+    func: object = field(compare=False)
+    args: tuple = field(compare=False)
+    on_done: object = field(compare=False)
+    on_error: object = field(compare=False)
+    cancel: CancellationToken = field(compare=False)
+    key: str | None = field(compare=False)
+
+
+class Executor:
+    """Runs callables on at most *max_workers* threads, highest priority first.
+
+    One worker is always kept free for INTERACTIVE work, so a long drain
+    or a slow prefetch never delays a submit.  Results are delivered on
+    the main thread through ``GLib.idle_add``; nothing is delivered for
+    work cancelled before it finishes.  Work submitted with a *key* is
+    dropped while another task with that key is queued or running.
+    """
+
+    def __init__(self, max_workers: int = _MAX_WORKERS):
+        self._max_workers = max(2, max_workers)
+        self._cond = threading.Condition()
+        self._heap: list[_Task] = []
+        self._seq = itertools.count()
+        self._workers: list[threading.Thread] = []
+        self._idle = 0
+        self._running_background = 0
+        self._keys: dict[str, CancellationToken] = {}
+        self._stats = ExecutorStats()
+        self._shutdown = False
+
+    def submit(self, func, *args, priority: Priority = Priority.INTERACTIVE,
+               on_done=None, on_error=None,
+               cancel: CancellationToken | None = None,
+               key: str | None = None) -> CancellationToken:
+        """Queue *func(\\*args)*; returns the token that cancels it.
+
+        *on_done(result)* or *on_error(exception)* is called on the main
+        thread.  Exceptions without an *on_error* are logged.
+        """
+        with self._cond:
+            if key is not None and key in self._keys:
+                return self._keys[key]
+            if cancel is None:
+                cancel = CancellationToken()
+            if key is not None:
+                self._keys[key] = cancel
+            task = _Task(int(priority), next(self._seq), func, args,
+                         on_done, on_error, cancel, key)
+            heapq.heappush(self._heap, task)
+            if not self._idle and len(self._workers) < self._max_workers:
+                t = threading.Thread(target=self._work, daemon=True,
+                                     name=f"ghissue-worker-{len(self._workers)}")
+                self._workers.append(t)
+                t.start()
+            self._cond.notify_all()
+        return cancel
+
+    def stats(self) -> ExecutorStats:
+        """Return a snapshot of queue depth and task counts."""
+        with self._cond:
+            queued = {p.name: 0 for p in Priority}
+            for task in self._heap:
+                queued[Priority(task.priority).name] += 1
+            return ExecutorStats(
+                queued=queued,
+                running=len(self._workers) - self._idle,
+                completed=self._stats.completed,
+                failed=self._stats.failed,
+                cancelled=self._stats.cancelled,
+            )
+
+    def shutdown(self):
+        """Cancel queued work and let the workers exit."""
+        with self._cond:
+            self._shutdown = True
+            pending, self._heap = self._heap, []
+            self._cond.notify_all()
+        for task in pending:
+            task.cancel.cancel()
+
+    def _next_task(self) -> _Task | None:
+        """Wait for runnable work. Holds _cond."""
+        while True:
+            if self._shutdown:
+                return None
+            if self._heap:
+                head = self._heap[0]
+                # Leave one worker for interactive work.
+                if (head.priority == Priority.INTERACTIVE
+                        or self._running_background < self._max_workers - 1):
+                    return heapq.heappop(self._heap)
+            self._idle += 1
+            self._cond.wait()
+            self._idle -= 1
+
+    def _work(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                if task is None:
+                    return
+                background = task.priority != Priority.INTERACTIVE
+                if background:
+                    self._running_background += 1
+            try:
+                self._run(task)
+            finally:
+                with self._cond:
+                    if background:
+                        self._running_background -= 1
+                    if task.key is not None and self._keys.get(task.key) is task.cancel:
+                        del self._keys[task.key]
+                    self._cond.notify_all()
+
+    def _run(self, task: _Task):
+        if task.cancel.cancelled:
+            self._count("cancelled")
+            return
+        try:
+            result = task.func(*task.args)
+        except Exception as e:
+            if task.cancel.cancelled:
+                self._count("cancelled")
+                return
+            self._count("failed")
+            if task.on_error is None:
+                _log.exception("background task %r failed", task.func)
+            else:
+                GLib.idle_add(self._deliver, task, task.on_error, e)
+            return
+        self._count("completed")
+        if task.on_done is not None:
+            GLib.idle_add(self._deliver, task, task.on_done, result)
+
+    def _count(self, what: str):
+        with self._cond:
+            setattr(self._stats, what, getattr(self._stats, what) + 1)
+
+    @staticmethod
+    def _deliver(task: _Task, callback, value):
+        # Checked again here: the owner may have cancelled while this
+        # callback was waiting for the main loop.
+        if not task.cancel.cancelled:
+            callback(value)
+        return False
@@ -0,0 +1,158 @@
+"""Ranked fuzzy matching over a growing list of names."""
+
+import heapq
+
+# Characters after which a match counts as the start of a word.
+_SEPARATORS = frozenset("/-_. ")
+
+_SCORE_SUBSTRING = 100
+_SCORE_PREFIX = 40        # substring starts a word (or the repo name)
+_SCORE_EXACT = 200        # query equals the part after the slash
+_SCORE_CHAR = 1
+_SCORE_CONSECUTIVE = 5
+_SCORE_WORD_START = 8
+_PENALTY_GAP = 1
+_PENALTY_LENGTH = 0.01
+
+_RESULT_CACHE_SIZE = 64
+
+
+def _char_mask(text: str) -> int:
+    mask = 0
+    for ch in text:
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class FuzzyIndex:
+    """Index of names supporting ranked substring and subsequence search.
+
+    Every name gets a character bitmask (a cheap filter for subsequence
+    matches) and is added to trigram posting lists (used to find
+    substring matches without scanning).  When a query extends the
+    previous one, only the previous candidates are rescanned, so typing
+    narrows instead of starting over.
+    """
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._masks: list[int] = []
+        self._trigrams: dict[str, list[int]] = {}
+        self._last_query = None
+        self._last_candidates: list[int] | None = None
+        # Recent results, so deleting characters is as cheap as typing them.
+        self._results: dict[tuple[str, int | None], list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, name: str) -> int:
+        """Index *name*; returns its position."""
+        key = name.lower()
+        i = len(self._keys)
+        self._keys.append(key)
+        self._masks.append(_char_mask(key))
+        for tri in _trigrams(key):
+            self._trigrams.setdefault(tri, []).append(i)
+        # Cached candidates no longer cover every name.
+        self._last_query = None
+        self._last_candidates = None
+        self._results.clear()
+        return i
+
+    def _substring_candidates(self, query: str) -> set[int] | None:
+        """Names containing every trigram of *query*, or None if too short."""
+        tris = _trigrams(query)
+        if not tris:
+            return None
+        postings = sorted((self._trigrams.get(t, []) for t in tris), key=len)
+        result = set(postings[0])
+        for p in postings[1:]:
+            result.intersection_update(p)
+            if not result:
+                break
+        return result
+
+    def _substring_score(self, key: str, query: str, pos: int) -> float:
+        score = _SCORE_SUBSTRING + len(query) * _SCORE_CONSECUTIVE
+        if pos == 0 or key[pos - 1] in _SEPARATORS:
+            score += _SCORE_PREFIX
+        if key.endswith(query) and key[-len(query) - 1:-len(query)] == "/":
+            score += _SCORE_EXACT
+        return score - len(key) * _PENALTY_LENGTH
+
+    def _subsequence_score(self, key: str, query: str) -> float | None:
+        """Greedy subsequence match, rewarding runs and word starts."""
+        score = 0.0
+        prev = -2
+        pos = 0
+        for ch in query:
+            found = key.find(ch, pos)
+            if found < 0:
+                return None
+            score += _SCORE_CHAR
+            if found == prev + 1:
+                score += _SCORE_CONSECUTIVE
+            elif prev >= 0:
+                score -= (found - prev - 1) * _PENALTY_GAP
+            if found == 0 or key[found - 1] in _SEPARATORS:
+                score += _SCORE_WORD_START
+            prev = found
+            pos = found + 1
+        return score - len(key) * _PENALTY_LENGTH
+
+    def search(self, query: str, limit: int | None = None) -> list[int]:
+        """Return positions of names matching *query*, best first.
+
+        Ties keep insertion order.  An empty query matches everything in
+        insertion order.
+        """
+        query = query.lower().strip()
+        if not query:
+            return list(range(len(self._keys)))[:limit]
+        cached = self._results.get((query, limit))
+        if cached is not None:
+            return cached
+
+        if (self._last_query is not None
+                and query.startswith(self._last_query)):
+            pool = self._last_candidates
+        else:
+            pool = range(len(self._keys))
+
+        qmask = _char_mask(query)
+        masks = self._masks
+        candidates = [i for i in pool if masks[i] & qmask == qmask]
+        substring = self._substring_candidates(query)
+
+        keys = self._keys
+        scored = []
+        matched = []
+        for i in candidates:
+            key = keys[i]
+            pos = key.find(query) if substring is None or i in substring else -1
+            if pos >= 0:
+                score = self._substring_score(key, query, pos)
+            else:
+                score = self._subsequence_score(key, query)
+                if score is None:
+                    continue
+            matched.append(i)
+            scored.append((-score, i))
+
+        self._last_query = query
+        self._last_candidates = matched
+
+        if limit is None:
+            scored.sort()
+        else:
+            scored = heapq.nsmallest(limit, scored)
+        result = [i for _score, i in scored]
+        if len(self._results) >= _RESULT_CACHE_SIZE:
+            self._results.clear()
+        self._results[(query, limit)] = result
+        return result
@@ -0,0 +1,179 @@
+"""Streaming bulk import of issues from JSONL or CSV.
+
+Records flow through a chain of generators, so a file of any size is
+imported in constant memory: ``read_records()`` parses one record at a
+time, ``validate()`` turns each into a QueuedIssue or a rejection, and
+``import_issues()`` enqueues the accepted issues a batch at a time.
+
+Each record has a ``title`` and optionally ``body``, ``labels`` and
+``repo`` (``owner/name``, defaulting to the one given on the command
+line).  In JSONL, ``labels`` is a list of strings; in CSV it is a
+comma-separated field.
+"""
+
+import csv
+import json
+import time
+from dataclasses import dataclass
+
+from . import config
+from .queue import QueuedIssue, length_error
+
+# Lets oversized CSV bodies reach validate() and be reported there.
+_CSV_FIELD_LIMIT = 16 * 1024 * 1024
+
+IMPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class Rejected:
+    line: int
+    reason: str
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    queued: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+
+def detect_format(path: str) -> str | None:
+    """Guess ``"jsonl"`` or ``"csv"`` from a file name."""
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return None
+
+
+def read_records(stream, fmt: str):
+    """Yield ``(line, record)`` pairs; *record* is a Rejected if unparsable."""
+    if fmt == "csv":
+        csv.field_size_limit(_CSV_FIELD_LIMIT)
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, Rejected(reader.line_num, f"CSV error: {e}")
+                continue
+            labels = row.get("labels") or ""
+            row["labels"] = [l.strip() for l in labels.split(",") if l.strip()]
+            yield reader.line_num, row
+
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, Rejected(line_no, f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, Rejected(line_no, "not a JSON object")
+            continue
+        yield line_no, record
+
+
+def validate(records, cfg: dict, labels, default_repo: str | None = None,
+             allow_new_labels: bool = False):
+    """Yield a QueuedIssue or a Rejected for each ``(line, record)``.
+
+    The repository must be configured.  Labels are checked against
+    *labels* (a LabelCache) where it has the repository cached; labels
+    GitHub does not know would otherwise be created one REST call at a
+    time during the drain, so they are rejected unless
+    *allow_new_labels*.
+    """
+    configured = {(r["owner"], r["name"]) for r in config.get_repos(cfg)}
+    known_labels: dict[tuple[str, str], set[str] | None] = {}
+
+    for line, record in records:
+        if isinstance(record, Rejected):
+            yield record
+            continue
+
+        repo = record.get("repo") or default_repo
+        title = record.get("title")
+        body = record.get("body") or ""
+        issue_labels = record.get("labels") or []
+
+        if not repo:
+            yield Rejected(line, "no repo given")
+            continue
+        owner, _, name = str(repo).partition("/")
+        if (owner, name) not in configured:
+            yield Rejected(line, f"repository not configured: {repo}")
+            continue
+        if not isinstance(title, str) or not title.strip():
+            yield Rejected(line, "missing title")
+            continue
+        if not isinstance(body, str):
+            yield Rejected(line, "body is not a string")
+            continue
+        too_long = length_error(title, body)
+        if too_long:
+            yield Rejected(line, too_long)
+            continue
+        if (not isinstance(issue_labels, list)
+                or not all(isinstance(l, str) for l in issue_labels)):
+            yield Rejected(line, "labels must be a list of strings")
+            continue
+
+        if not allow_new_labels and issue_labels:
+            key = (owner, name)
+            if key not in known_labels:
+                cached = labels.get(owner, name)
+                known_labels[key] = (
+                    None if cached is None else {l.name for l in cached}
+                )
+            known = known_labels[key]
+            unknown = [l for l in issue_labels if known is not None and l not in known]
+            if unknown:
+                yield Rejected(line, f"unknown label(s): {', '.join(unknown)}")
+                continue
+
+        yield QueuedIssue(
+            title=title.strip(), body=body, labels=issue_labels,
+            owner=owner, repo=name,
+        )
+
+
+def import_issues(issues, queue, batch_size: int = IMPORT_BATCH_SIZE,
+                  on_rejected=None, on_progress=None) -> ImportStats:
+    """Enqueue the output of ``validate()`` in batches.
+
+    *on_rejected(rejected)* is called for each rejection and
+    *on_progress(stats)* after each batch.
+    """
+    stats = ImportStats()
+    started = time.monotonic()
+    batch = []
+
+    def _flush():
+        queue.enqueue_many(batch)
+        stats.queued += len(batch)
+        batch.clear()
+        stats.elapsed = time.monotonic() - started
+        if on_progress is not None:
+            on_progress(stats)
+
+    for item in issues:
+        stats.read += 1
+        if isinstance(item, Rejected):
+            stats.rejected += 1
+            if on_rejected is not None:
+                on_rejected(item)
+            continue
+        batch.append(item)
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+    stats.elapsed = time.monotonic() - started
+    return stats
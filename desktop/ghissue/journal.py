@@ -0,0 +1,248 @@
+"""Append-only JSON-lines journal with tombstones and compaction."""
+
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Compact once dead records outnumber live ones by this factor...
+_COMPACT_RATIO = 1
+# ...and there are at least this many of them.
+_COMPACT_MIN_DEAD = 256
+# Bytes read at a time when looking for the end of the last full line.
+_TAIL_CHUNK = 4096
+
+
+class JournalReplaced(Exception):
+    """The log was replaced (compacted) since the positions were taken."""
+
+
+class Journal:
+    """Keyed record store backed by an append-only log.
+
+    Each line of the log is one JSON record, either
+    ``{"op": "put", "id": ..., "item": {...}}`` or
+    ``{"op": "del", "id": ...}``.  Replaying the log in order yields the
+    current contents; a later ``put`` for the same id replaces the item
+    but keeps its original position.  Writers serialise through an
+    ``flock`` on a sidecar lock file so several processes can share the
+    same journal.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock_path = path + ".lock"
+
+    @contextmanager
+    def locked(self):
+        """Hold the cross-process write lock for the duration."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def identity(self) -> tuple[tuple[int, int], int] | None:
+        """Return ``((st_dev, st_ino), st_size)`` of the log, or None.
+
+        Appends only grow the size; compaction replaces the file and so
+        changes the inode.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino), st.st_size
+
+    # ── Writing ──
+
+    def append(self, records: list[dict], sync: bool = False) -> tuple[int, int]:
+        """Append *records* in one write. Caller must hold ``locked()``.
+
+        Returns ``(offset, size)``: where the write started and the file
+        size after it.  A torn last line, left by a crash or a failed
+        write, is cut off first so the new records start on a line of
+        their own; if this write fails, the file is cut back again.
+        """
+        data = "".join(
+            json.dumps(r, separators=(",", ":")) + "\n" for r in records
+        ).encode()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            offset = _complete_size(fd)
+            if offset != os.fstat(fd).st_size:
+                os.ftruncate(fd, offset)
+            if data:
+                try:
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                    if sync:
+                        os.fsync(fd)
+                except BaseException:
+                    os.ftruncate(fd, offset)
+                    raise
+            return offset, offset + len(data)
+        finally:
+            os.close(fd)
+
+    def put(self, item_id: str, item: dict, sync: bool = False):
+        with self.locked():
+            return self.append([_put(item_id, item)], sync=sync)
+
+    def put_many(self, items: list[dict], sync: bool = False):
+        """Append several items keyed by their ``"id"`` field."""
+        with self.locked():
+            return self.append_items(items, sync=sync)
+
+    def append_items(self, items: list[dict], sync: bool = False):
+        """As put_many(), for a caller already holding ``locked()``."""
+        return self.append([_put(i["id"], i) for i in items], sync=sync)
+
+    def delete(self, item_id: str, sync: bool = False):
+        with self.locked():
+            return self.append([_del(item_id)], sync=sync)
+
+    def delete_many(self, item_ids: list[str], sync: bool = False):
+        with self.locked():
+            return self.append([_del(i) for i in item_ids], sync=sync)
+
+    def rewrite(self, items: list[dict]):
+        """Atomically replace the log with one ``put`` per live item.
+
+        Caller must hold ``locked()``.
+        """
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for item in items:
+                    f.write(json.dumps(_put(item["id"], item),
+                                       separators=(",", ":")))
+                    f.write("\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    # ── Reading ──
+
+    def records(self, start: int = 0):
+        """Yield ``(offset, length, record)`` for each complete log line.
+
+        *record* is None for a line that does not parse.  A trailing line
+        without its newline (a write in progress, or torn by a crash) is
+        not yielded, so ``offset + length`` of the last yielded line is
+        how far the log has been consumed.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if not (isinstance(record, dict) and "id" in record):
+                    record = None
+                yield offset, len(line), record
+                offset += len(line)
+
+    def read_items(self, positions, inode) -> list[dict] | None:
+        """Return the items of the ``put`` records at *positions*.
+
+        *positions* is an iterable of ``(offset, length)`` pairs taken
+        from ``records()`` while the log had identity *inode*.  Returns
+        None if the log has since been replaced.
+        """
+        try:
+            return list(self.iter_items(positions, inode))
+        except JournalReplaced:
+            return None
+
+    def iter_items(self, positions, inode):
+        """Yield the items at *positions* one at a time; see read_items().
+
+        Raises JournalReplaced, before yielding anything, if the log has
+        been replaced.  Once open, the file stays readable even if it is
+        replaced meanwhile.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            raise JournalReplaced() from None
+        with f:
+            st = os.fstat(f.fileno())
+            if (st.st_dev, st.st_ino) != inode:
+                raise JournalReplaced()
+            for offset, length in positions:
+                f.seek(offset)
+                yield json.loads(f.read(length))["item"]
+
+    def replay(self) -> tuple[dict[str, dict], int]:
+        """Return ``(live items by id, number of dead records)``."""
+        items: dict[str, dict] = {}
+        dead = 0
+        for _offset, _length, record in self.records():
+            if record is None:
+                dead += 1
+            elif record.get("op") == "put":
+                if record["id"] in items:
+                    dead += 1
+                items[record["id"]] = record.get("item", {})
+            elif record.get("op") == "del":
+                if items.pop(record["id"], None) is not None:
+                    dead += 1
+                dead += 1
+        return items, dead
+
+    def needs_compaction(self, live: int, dead: int) -> bool:
+        return dead >= _COMPACT_MIN_DEAD and dead > live * _COMPACT_RATIO
+
+    def compact(self) -> int:
+        """Rewrite the log without dead records. Returns live item count."""
+        with self.locked():
+            items, dead = self.replay()
+            if dead:
+                self.rewrite(list(items.values()))
+            return len(items)
+
+
+def _complete_size(fd: int) -> int:
+    """Return the size of *fd*'s file up to and including its last newline."""
+    end = os.fstat(fd).st_size
+    pos = end
+    while pos > 0:
+        start = max(pos - _TAIL_CHUNK, 0)
+        chunk = os.pread(fd, pos - start, start)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        pos = start
+    return 0
+
+
+def _put(item_id: str, item: dict) -> dict:
+    return {"op": "put", "id": item_id, "item": item}
+
+
+def _del(item_id: str) -> dict:
+    return {"op": "del", "id": item_id}
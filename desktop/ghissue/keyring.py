@@ -2,6 +2,7 @@
 
 import os
 import stat
+import threading
 
 _SCHEMA_NAME = "com.github.ghissue.token"
 _FALLBACK_DIR = os.path.join(
@@ -37,13 +38,64 @@ def _attrs():
     return {"app": "ghissue"}
 
 
+# ── In-memory cache ──
+#
+# Secret Service lookups are D-Bus round trips that can stall for a long
+# time when the keyring is locked, so the token is cached.  The cache is
+# updated by store_token/clear_token and dropped when the Secret Service
+# reports that an item changed (see watch_changes).
+
+_UNKNOWN = object()
+_cache_lock = threading.Lock()
+_cached = _UNKNOWN
+_generation = 0  # bumped on every invalidation; stale lookups are discarded
+_watch_id = None
+
+
+def _set_cached(token: str | None, generation: int | None = None):
+    """Cache *token*.
+
+    A lookup passes the *generation* it started in and is dropped if the
+    cache was invalidated or written meanwhile; a write passes None.
+    """
+    global _cached, _generation
+    with _cache_lock:
+        if generation is None:
+            _generation += 1
+        elif generation != _generation:
+            return
+        _cached = token
+
+
+def invalidate():
+    """Forget the cached token; the next lookup asks the keyring again."""
+    global _cached, _generation
+    with _cache_lock:
+        _cached = _UNKNOWN
+        _generation += 1
+
+
 def store_token(token: str):
-    """Store an OAuth token."""
+    """Store an OAuth token.
+
+    The cache is updated at once.  The Secret Service write is
+    asynchronous (it completes on the main loop); the plaintext fallback
+    is used if libsecret is unavailable or the write fails.
+    """
+    _set_cached(token)
     if _init_libsecret():
+        def _done(_source, result):
+            try:
+                if _Secret.password_store_finish(result):
+                    return
+            except Exception:
+                pass
+            _store_fallback(token)
+
         try:
-            _Secret.password_store_sync(
+            _Secret.password_store(
                 _schema, _attrs(), _Secret.COLLECTION_DEFAULT,
-                "ghissue GitHub token", token, None,
+                "ghissue GitHub token", token, None, _done,
             )
             return
         except Exception:
@@ -52,22 +104,77 @@ def store_token(token: str):
 
 
 def get_token() -> str | None:
-    """Retrieve the stored token, or None."""
+    """Retrieve the stored token, or None.
+
+    Served from the cache when possible; otherwise this blocks on the
+    keyring, so call it from a background thread (or use
+    get_token_async on the main thread).
+    """
+    with _cache_lock:
+        if _cached is not _UNKNOWN:
+            return _cached
+        generation = _generation
+    token = None
     if _init_libsecret():
         try:
             token = _Secret.password_lookup_sync(_schema, _attrs(), None)
-            if token:
-                return token
         except Exception:
             pass
-    return _get_fallback()
+    token = token or _get_fallback()
+    _set_cached(token, generation)
+    return token
+
+
+def get_token_async(callback):
+    """Look up the token without blocking; calls *callback(token)*.
+
+    With a warm cache *callback* runs immediately; otherwise it runs
+    from the main loop once the Secret Service answers.
+    """
+    with _cache_lock:
+        if _cached is not _UNKNOWN:
+            token = _cached
+            generation = None
+        else:
+            generation = _generation
+    if generation is None:
+        callback(token)
+        return
+
+    def _finish(token):
+        token = token or _get_fallback()
+        _set_cached(token, generation)
+        callback(token)
+
+    if not _init_libsecret():
+        _finish(None)
+        return
+
+    def _done(_source, result):
+        try:
+            token = _Secret.password_lookup_finish(result)
+        except Exception:
+            token = None
+        _finish(token)
+
+    try:
+        _Secret.password_lookup(_schema, _attrs(), None, _done)
+    except Exception:
+        _finish(None)
 
 
 def clear_token():
-    """Remove the stored token."""
+    """Remove the stored token (the Secret Service call is asynchronous)."""
+    _set_cached(None)
     if _init_libsecret():
+        def _done(_source, result):
+            try:
+                _Secret.password_clear_finish(result)
+            except Exception:
+                pass
+
         try:
-            _Secret.password_clear_sync(_schema, _attrs(), None)
+            _Secret.password_clear(_schema, _attrs(), None, _done)
         except Exception:
             pass
     try:
@@ -77,9 +184,48 @@ def clear_token():
 
 
 def is_logged_in() -> bool:
+    """Whether a token is stored. Blocks only if the cache is cold."""
     return get_token() is not None
 
 
+def cached_login_state() -> bool | None:
+    """Whether a token is stored, from the cache only; None if cold."""
+    with _cache_lock:
+        if _cached is _UNKNOWN:
+            return None
+        return _cached is not None
+
+
+def watch_changes():
+    """Invalidate the cache when Secret Service items change.
+
+    Subscribes to the Collection signals on the session bus and re-reads
+    the token asynchronously afterwards.  Needs a GLib main loop.
+    """
+    global _watch_id
+    if _watch_id is not None:
+        return
+    from gi.repository import Gio
+
+    def _on_signal(*_args):
+        invalidate()
+        get_token_async(lambda _token: None)
+
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+    except Exception:
+        return
+    _watch_id = bus.signal_subscribe(
+        "org.freedesktop.secrets",
+        "org.freedesktop.Secret.Collection",
+        None,
+        None,
+        None,
+        Gio.DBusSignalFlags.NONE,
+        _on_signal,
+    )
+
+
 # ── Fallback: plaintext file with 0600 perms ──
 
 def _store_fallback(token: str):
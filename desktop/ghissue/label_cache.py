@@ -0,0 +1,109 @@
+"""On-disk cache of repository labels, revalidated with ETags."""
+
+import json
+import os
+import tempfile
+import threading
+
+from .api import Label, LabelPage
+from .cancel import CancellationToken
+
+_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "ghissue",
+    "labels",
+)
+
+
+def _cache_file(owner: str, repo: str) -> str:
+    return os.path.join(_CACHE_DIR, owner, f"{repo}.json")
+
+
+class LabelCache:
+    """Labels per owner/repo, kept in memory and under XDG_CACHE_HOME.
+
+    ``get()`` never touches the network, so dialogs can render chips
+    immediately.  ``refresh()`` revalidates every cached page with
+    ``If-None-Match`` and stores whatever changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages: dict[tuple[str, str], list[LabelPage]] = {}
+
+    def _load(self, owner: str, repo: str) -> list[LabelPage] | None:
+        try:
+            with open(_cache_file(owner, repo), "r") as f:
+                data = json.load(f)
+            return [
+                LabelPage(
+                    etag=p.get("etag"),
+                    labels=[Label(**label) for label in p["labels"]],
+                )
+                for p in data["pages"]
+            ]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+    def _save(self, owner: str, repo: str, pages: list[LabelPage]):
+        path = _cache_file(owner, repo)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        data = {
+            "pages": [
+                {
+                    "etag": p.etag,
+                    "labels": [
+                        {"name": l.name, "color": l.color,
+                         "description": l.description}
+                        for l in p.labels
+                    ],
+                }
+                for p in pages
+            ],
+        }
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _cached_pages(self, owner: str, repo: str) -> list[LabelPage] | None:
+        key = (owner, repo)
+        with self._lock:
+            pages = self._pages.get(key)
+            if pages is None:
+                pages = self._load(owner, repo)
+                if pages is not None:
+                    self._pages[key] = pages
+            return pages
+
+    def get(self, owner: str, repo: str) -> list[Label] | None:
+        """Return cached labels, or None if the repo was never fetched."""
+        pages = self._cached_pages(owner, repo)
+        if pages is None:
+            return None
+        return [label for page in pages for label in page.labels]
+
+    def refresh(self, api, token: str, owner: str, repo: str,
+                cancel: CancellationToken | None = None) -> tuple[list[Label], bool]:
+        """Revalidate against GitHub. Call from a background thread.
+
+        Returns ``(labels, changed)``; *changed* is False when every page
+        came back 304 Not Modified.
+        """
+        cached = self._cached_pages(owner, repo)
+        pages, changed = api.list_label_pages(token, owner, repo, cached, cancel)
+        if cached is None:
+            changed = True
+        if changed:
+            with self._lock:
+                self._pages[(owner, repo)] = pages
+            self._save(owner, repo, pages)
+        return [label for page in pages for label in page.labels], changed
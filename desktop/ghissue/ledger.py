@@ -0,0 +1,66 @@
+"""Durable record of submissions whose outcome is not yet known."""
+
+import re
+import time
+
+from .journal import Journal
+
+# Appended to every queued issue's body when it is submitted, so it can
+# be recognised on GitHub after a crash.  Invisible in rendered Markdown.
+_MARKER = "<!-- ghissue:id={} -->"
+_MARKER_RE = re.compile(r"<!-- ghissue:id=([0-9A-Za-z-]+) -->")
+# Characters mark_body() adds to a non-empty body with a uuid4 id.
+MARKER_OVERHEAD = len("\n\n" + _MARKER.format("0" * 36))
+
+
+def mark_body(body: str, issue_id: str) -> str:
+    """Return *body* carrying the hidden marker for *issue_id*."""
+    marker = _MARKER.format(issue_id)
+    return f"{body}\n\n{marker}" if body else marker
+
+
+def find_marker(body: str | None) -> str | None:
+    """Return the queued issue id embedded in *body*, if any."""
+    match = _MARKER_RE.search(body or "")
+    return match.group(1) if match else None
+
+
+class SubmissionLedger:
+    """Issues that may have reached GitHub but are still in the queue.
+
+    ``begin()`` is fsynced before a batch is sent; ``end()`` is called
+    once the outcome is known and the queue updated.  Anything still
+    recorded when a drain starts was cut off mid-flight (crash, kill,
+    dropped connection) and has to be looked up on GitHub before it
+    may be sent again.
+    """
+
+    def __init__(self, path: str):
+        self._journal = Journal(path)
+
+    def begin(self, issues):
+        started = time.time()
+        self._journal.put_many(
+            [
+                {"id": i.id, "owner": i.owner, "repo": i.repo,
+                 "started": started}
+                for i in issues
+            ],
+            sync=True,
+        )
+
+    def end(self, issue_ids: list[str]):
+        if not issue_ids:
+            return
+        self._journal.delete_many(issue_ids)
+        with self._journal.locked():
+            items, dead = self._journal.replay()
+            # Usually nothing is in flight afterwards; start afresh.
+            if not items and dead:
+                self._journal.rewrite([])
+
+    def pending(self) -> dict[str, dict]:
+        """Return in-flight records (``owner``, ``repo``, ``started``) by id."""
+        if not self._journal.exists():
+            return {}
+        return self._journal.replay()[0]
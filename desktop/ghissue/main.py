@@ -1,11 +1,11 @@
 """Entry point: DBus service daemon and GLib main loop."""
 
-import argparse
 import json
+import logging
 import os
 import signal
-import sys
 import threading
+import time
 
 import gi
 
@@ -14,14 +14,16 @@ gi.require_version("Notify", "0.7")
 
 from gi.repository import Gio, GLib, Gtk, Notify
 
-from . import config
+from . import __version__, config
 from .api import GitHubAPI
-from .keyring import get_token, is_logged_in
+from .client import APP_ID as _APP_ID, DBUS_PATH as _DBUS_PATH
+from .drain import DrainCoordinator
+from .executor import Executor, Priority
+from . import keyring
+from .keyring import get_token_async
+from .label_cache import LabelCache
 from .network import NetworkMonitor
-from .queue import IssueQueue
-
-_APP_ID = "com.github.ghissue"
-_DBUS_PATH = "/com/github/ghissue"
+from .queue import IssueQueue, QueuedIssue, length_error
 
 _DBUS_XML = """
 <node>
@@ -30,47 +32,79 @@ _DBUS_XML = """
       <arg type="s" name="owner" direction="in"/>
       <arg type="s" name="repo" direction="in"/>
     </method>
+    <method name="CreateIssueDirect">
+      <arg type="s" name="repo" direction="in"/>
+      <arg type="s" name="title" direction="in"/>
+      <arg type="s" name="body" direction="in"/>
+      <arg type="as" name="labels" direction="in"/>
+      <arg type="s" name="id" direction="out"/>
+    </method>
+    <method name="CreateIssues">
+      <arg type="a(sssas)" name="issues" direction="in"/>
+      <arg type="as" name="ids" direction="out"/>
+    </method>
     <method name="OpenSettings"/>
     <method name="GetRepos">
       <arg type="s" name="json" direction="out"/>
     </method>
+    <method name="ListRepos">
+      <arg type="t" name="generation" direction="out"/>
+      <arg type="a(sss)" name="repos" direction="out"/>
+    </method>
+    <method name="GetState">
+      <arg type="a{sv}" name="state" direction="out"/>
+    </method>
     <method name="GetQueueCount">
       <arg type="i" name="count" direction="out"/>
     </method>
+    <method name="Drain">
+      <arg type="t" name="drain" direction="out"/>
+    </method>
     <method name="Quit"/>
-    <signal name="ReposChanged"/>
+    <signal name="ReposChanged">
+      <arg type="t" name="generation"/>
+      <arg type="a(sss)" name="repos"/>
+    </signal>
+    <signal name="QueueChanged">
+      <arg type="i" name="count"/>
+    </signal>
+    <signal name="DrainProgress">
+      <arg type="t" name="drain"/>
+      <arg type="u" name="submitted"/>
+      <arg type="u" name="deferred"/>
+      <arg type="u" name="failed"/>
+      <arg type="u" name="total"/>
+      <arg type="b" name="finished"/>
+      <arg type="s" name="stopped_reason"/>
+    </signal>
   </interface>
 </node>
 """
 
+_ERROR_INVALID_ARGS = "org.freedesktop.DBus.Error.InvalidArgs"
+_ERROR_FAILED = "org.freedesktop.DBus.Error.Failed"
+_ERROR_UNKNOWN_REPO = f"{_APP_ID}.Error.UnknownRepository"
 
-def run_in_background(func, callback=None):
-    """Run *func* in a daemon thread; post *callback(result)* via GLib.idle_add."""
-    def _worker():
-        result = func()
-        if callback:
-            GLib.idle_add(callback, result)
-    t = threading.Thread(target=_worker, daemon=True)
-    t.start()
-    return t
+_log = logging.getLogger(__name__)
 
 
 class Application:
     def __init__(self):
-        Notify.init("ghissue")
-        self.api = GitHubAPI()
-        self.queue = IssueQueue()
-        self.cfg = config.load()
         self._connection = None
-
-        # Network monitor — drain queue when connectivity returns
-        self.net = NetworkMonitor(on_network_available=self._on_network_up)
-
-        # Drain queue on startup if non-empty
-        if self.queue.count() > 0:
-            self._try_drain()
-
-        # Register DBus service
+        self._api = None
+        self._api_lock = threading.Lock()
+        self.executor = Executor()
+        self._started = time.monotonic()
+
+        # Everything GetRepos and GetQueueCount need, then the bus name,
+        # so clients can reach us before the slower services are up.
+        self.config_store = config.ConfigStore()
+        self.queue = IssueQueue()
+        self.drainer = DrainCoordinator(
+            self.queue, lambda: self.api, self.executor,
+            on_drained=self._on_drained,
+            on_progress=self._on_drain_progress,
+        )
         self._dbus_owner_id = Gio.bus_own_name(
             Gio.BusType.SESSION,
             _APP_ID,
@@ -79,10 +113,81 @@ class Application:
             None,
             None,
         )
+        self.config_store.watch()
+        self.config_store.connect_changed(self._publish_repos)
+        self.queue.watch()
+        self.queue.connect_changed(self._publish_queue_count)
+        # Last state signalled, so signals only go out on a real change
+        self._repos_generation = 1
+        self._published_repos = self._repo_list()
+        self._published_queue_count = self.queue.count()
+        self.labels = LabelCache()
+        self.net = None
+
+        # The rest starts one stage per idle callback, so D-Bus calls
+        # arriving meanwhile are served between stages.
+        self._startup_stages = [
+            ("notifications", self._start_notifications),
+            ("http", self._start_http),
+            ("keyring", self._start_keyring),
+            ("network", self._start_network),
+            ("drain", self._start_drain),
+        ]
+        GLib.idle_add(self._run_startup_stage)
+
+    @property
+    def cfg(self) -> dict:
+        """The live config dict; persist edits with ``config_store.save()``."""
+        return self.config_store.data
+
+    @property
+    def api(self) -> GitHubAPI:
+        """The HTTP client, created on first use if startup has not got there."""
+        with self._api_lock:
+            if self._api is None:
+                self._api = GitHubAPI()
+            return self._api
+
+    # ── Startup ──
+
+    def _run_startup_stage(self):
+        name, stage = self._startup_stages.pop(0)
+        t0 = time.monotonic()
+        stage()
+        _log.info("startup: %s took %.1f ms", name, (time.monotonic() - t0) * 1000)
+        if self._startup_stages:
+            return True
+        _log.info("startup: complete %.1f ms after launch",
+                  (time.monotonic() - self._started) * 1000)
+        return False
+
+    def _start_notifications(self):
+        if not Notify.is_initted():
+            Notify.init("ghissue")
+
+    def _start_http(self):
+        self.api  # create the session now rather than on first request
+
+    def _start_keyring(self):
+        # Warm the token cache without blocking, and keep it current
+        keyring.watch_changes()
+        get_token_async(lambda _token: None)
+
+    def _start_network(self):
+        # Network monitor — drain queue when connectivity returns
+        self.net = NetworkMonitor(
+            on_network_available=self.drainer.network_changed,
+        )
+
+    def _start_drain(self):
+        # Drain queue on startup if non-empty
+        self.drainer.request()
 
     # ── DBus ──
 
     def _on_bus_acquired(self, connection, name):
+        _log.info("startup: bus acquired %.1f ms after launch",
+                  (time.monotonic() - self._started) * 1000)
         self._connection = connection
         introspection = Gio.DBusNodeInfo.new_for_xml(_DBUS_XML)
         connection.register_object(
@@ -93,16 +198,70 @@ class Application:
             None,
         )
 
-    def _emit_repos_changed(self):
+    def _emit_signal(self, name, params=None):
         if self._connection:
             self._connection.emit_signal(
                 None,
                 _DBUS_PATH,
                 _APP_ID,
-                "ReposChanged",
-                None,
+                name,
+                params,
             )
 
+    def _repo_list(self) -> list[tuple[str, str, str]]:
+        return [
+            (r["owner"], r["name"], r.get("color", config.PRESET_COLORS[3]))
+            for r in config.get_repos(self.cfg)
+        ]
+
+    def _publish_repos(self):
+        """Emit ReposChanged if the repository list differs from the last one."""
+        repos = self._repo_list()
+        if repos == self._published_repos:
+            return
+        self._published_repos = repos
+        self._repos_generation += 1
+        self._emit_signal(
+            "ReposChanged",
+            GLib.Variant("(ta(sss))", (self._repos_generation, repos)),
+        )
+
+    def _publish_queue_count(self):
+        """Emit QueueChanged if the number of queued issues changed."""
+        n = self.queue.count()
+        if n == self._published_queue_count:
+            return
+        self._published_queue_count = n
+        self._emit_signal("QueueChanged", GLib.Variant("(i)", (n,)))
+
+    def _state(self) -> GLib.Variant:
+        """Build the GetState reply from in-memory state only.
+
+        Keys: ``version`` (s), ``repos-generation`` (t), ``repos``
+        (a(sss) owner, name, color), ``queue-count`` (i), ``queue`` (a{si}
+        by owner/repo), ``logged-in`` (b; absent while the token cache is
+        cold) and ``rate-limit`` (a{sv}; absent before the first API call).
+        """
+        state = {
+            "version": GLib.Variant("s", __version__),
+            "repos-generation": GLib.Variant("t", self._repos_generation),
+            "repos": GLib.Variant("a(sss)", self._published_repos),
+            "queue-count": GLib.Variant("i", self.queue.count()),
+            "queue": GLib.Variant("a{si}", self.queue.repo_counts()),
+        }
+        logged_in = keyring.cached_login_state()
+        if logged_in is not None:
+            state["logged-in"] = GLib.Variant("b", logged_in)
+        if self._api is not None:
+            budget = self._api.rate_limit
+            rate = {"blocked-for": GLib.Variant("d", budget.blocked_for)}
+            if budget.limit is not None:
+                rate["limit"] = GLib.Variant("i", budget.limit)
+                rate["remaining"] = GLib.Variant("i", budget.remaining)
+                rate["reset"] = GLib.Variant("x", int(budget.reset))
+            state["rate-limit"] = GLib.Variant("a{sv}", rate)
+        return GLib.Variant("(a{sv})", (state,))
+
     def _on_dbus_method_call(self, connection, sender, object_path,
                              interface_name, method_name, parameters,
                              invocation):
@@ -111,6 +270,16 @@ class Application:
             repo = parameters.unpack()[1]
             GLib.idle_add(self._on_create_issue, owner, repo)
             invocation.return_value(None)
+        elif method_name == "CreateIssueDirect":
+            self._create_direct(
+                invocation, [parameters.unpack()],
+                lambda ids: GLib.Variant("(s)", (ids[0],)),
+            )
+        elif method_name == "CreateIssues":
+            self._create_direct(
+                invocation, parameters.unpack()[0],
+                lambda ids: GLib.Variant("(as)", (ids,)),
+            )
         elif method_name == "OpenSettings":
             GLib.idle_add(self._on_settings)
             invocation.return_value(None)
@@ -121,9 +290,20 @@ class Application:
                 for r in repos
             ])
             invocation.return_value(GLib.Variant("(s)", (payload,)))
+        elif method_name == "ListRepos":
+            invocation.return_value(GLib.Variant(
+                "(ta(sss))", (self._repos_generation, self._published_repos),
+            ))
+        elif method_name == "GetState":
+            invocation.return_value(self._state())
         elif method_name == "GetQueueCount":
             n = self.queue.count()
             invocation.return_value(GLib.Variant("(i)", (n,)))
+        elif method_name == "Drain":
+            # The caller may have just written to the queue
+            self.queue.invalidate()
+            seq = self.drainer.request()
+            invocation.return_value(GLib.Variant("(t)", (seq,)))
         elif method_name == "Quit":
             invocation.return_value(None)
             GLib.idle_add(self._on_quit)
@@ -136,7 +316,60 @@ class Application:
     # ── Actions ──
 
     def _on_create_issue(self, owner, repo):
-        if not is_logged_in():
+        get_token_async(
+            lambda token: self._open_create_issue(owner, repo, token)
+        )
+
+    def _create_direct(self, invocation, entries, reply):
+        """Queue (repo, title, body, labels) *entries* without a dialog.
+
+        Nothing is queued unless every entry names a configured
+        ``owner/name`` and has a title, and no title or body is longer
+        than GitHub accepts.  The journal append runs on the
+        executor; the caller gets *reply(ids)* once it is on disk, and
+        the drain engine takes it from there.
+        """
+        configured = {(r["owner"], r["name"]) for r in config.get_repos(self.cfg)}
+        issues = []
+        for repo, title, body, labels in entries:
+            owner, _, name = repo.partition("/")
+            if (owner, name) not in configured:
+                invocation.return_dbus_error(
+                    _ERROR_UNKNOWN_REPO, f"Repository not configured: {repo}",
+                )
+                return
+            if not title.strip():
+                invocation.return_dbus_error(
+                    _ERROR_INVALID_ARGS, f"Issue for {repo} has no title",
+                )
+                return
+            too_long = length_error(title, body)
+            if too_long:
+                invocation.return_dbus_error(
+                    _ERROR_INVALID_ARGS, f"Issue for {repo}: {too_long}",
+                )
+                return
+            issues.append(QueuedIssue(
+                title=title.strip(), body=body, labels=list(labels),
+                owner=owner, repo=name,
+            ))
+
+        def _queued(_result):
+            invocation.return_value(reply([i.id for i in issues]))
+            self.drainer.request()
+
+        def _failed(exc):
+            invocation.return_dbus_error(_ERROR_FAILED, f"Could not queue: {exc}")
+
+        self.executor.submit(
+            self.queue.enqueue_many, issues,
+            priority=Priority.INTERACTIVE,
+            on_done=_queued,
+            on_error=_failed,
+        )
+
+    def _open_create_issue(self, owner, repo, token):
+        if not token:
             self._notify("ghissue", "Please log in first in Settings.")
             return
         if not config.find_repo(self.cfg, owner, repo):
@@ -152,10 +385,13 @@ class Application:
         dlg = SettingsDialog(self)
         dlg.run()
         dlg.destroy()
-        self.cfg = config.load()
-        self._emit_repos_changed()
+        self.config_store.flush()
+        self._publish_repos()
 
     def _on_quit(self):
+        self.config_store.flush()
+        self.drainer.stop()
+        self.executor.shutdown()
         if self._dbus_owner_id:
             Gio.bus_unown_name(self._dbus_owner_id)
         Notify.uninit()
@@ -163,28 +399,28 @@ class Application:
 
     # ── Queue draining ──
 
-    def _on_network_up(self):
-        if self.queue.count() > 0:
-            self._try_drain()
-
-    def _try_drain(self):
-        token = get_token()
-        if not token:
-            return
-
-        def _drain():
-            return self.queue.drain(self.api, token)
-
-        def _on_drained(result):
-            if result.submitted > 0:
-                self._notify(
-                    "Issues submitted",
-                    f"{result.submitted} queued issue(s) submitted.",
-                )
+    def _on_drained(self, result):
+        if result.submitted > 0:
+            self._notify(
+                "Issues submitted",
+                f"{result.submitted} queued issue(s) submitted.",
+            )
+        if result.failed > 0:
+            self._notify(
+                "Issues not submitted",
+                f"{result.failed} queued issue(s) failed and were set aside; "
+                "see ghissue queue dead.",
+            )
 
-        run_in_background(_drain, _on_drained)
+    def _on_drain_progress(self, seq, totals, finished):
+        self._emit_signal("DrainProgress", GLib.Variant("(tuuuubs)", (
+            seq, totals.submitted, totals.deferred, totals.failed, totals.total,
+            finished, totals.stopped_reason or "",
+        )))
+        return False
 
     def _notify(self, title, body):
+        self._start_notifications()
         n = Notify.Notification.new(title, body, "dialog-information")
         try:
             n.show()
@@ -198,51 +434,16 @@ class Application:
         Gtk.main()
 
 
-def _send_dbus_call(method, params=None, reply_type=None):
-    """Send a DBus call to the running daemon and exit."""
-    try:
-        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
-        bus.call_sync(
-            _APP_ID,
-            _DBUS_PATH,
-            _APP_ID,
-            method,
-            params,
-            reply_type,
-            Gio.DBusCallFlags.NONE,
-            5000,
-            None,
-        )
-    except GLib.Error as e:
-        print(f"ghissue: could not reach daemon: {e.message}", file=sys.stderr)
-        sys.exit(1)
+def run_daemon():
+    """Start the daemon; ``ghissue`` without options ends up here."""
+    logging.basicConfig(level=logging.INFO, format="ghissue: %(message)s")
+    app = Application()
+    app.run()
 
 
 def main():
-    parser = argparse.ArgumentParser(description="ghissue — quick GitHub issue creator")
-    parser.add_argument(
-        "--create",
-        action="store_true",
-        help="Open the Create Issue dialog on the running daemon and exit",
-    )
-    args = parser.parse_args()
-
-    if args.create:
-        # Use first configured repo
-        cfg = config.load()
-        repo = config.get_repo(cfg)
-        if repo:
-            _send_dbus_call(
-                "CreateIssue",
-                GLib.Variant("(ss)", (repo[0], repo[1])),
-            )
-        else:
-            print("ghissue: no repository configured", file=sys.stderr)
-            sys.exit(1)
-        return
-
-    app = Application()
-    app.run()
+    from .client import main as client_main
+    client_main()
 
 
 if __name__ == "__main__":
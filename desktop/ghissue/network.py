@@ -1,9 +1,19 @@
 """Connectivity monitoring via Gio.NetworkMonitor."""
 
+import threading
+
 import gi
 
 gi.require_version("Gio", "2.0")
-from gi.repository import Gio
+from gi.repository import Gio, GLib
+
+_API_HOST = "api.github.com"
+_API_PORT = 443
+
+
+def api_address() -> Gio.NetworkAddress:
+    """The GitHub API endpoint, for reachability checks."""
+    return Gio.NetworkAddress.new(_API_HOST, _API_PORT)
 
 
 class NetworkMonitor:
@@ -23,3 +33,22 @@ class NetworkMonitor:
 
     def is_available(self) -> bool:
         return self._monitor.get_network_available()
+
+    def can_reach_api(self, timeout: float) -> bool:
+        """Check within *timeout* seconds whether GitHub's API is reachable.
+
+        Blocks, so call it from a worker thread.  Returns False at once
+        when the system reports no network, and False if the probe (DNS
+        lookup included) has not succeeded by the deadline.
+        """
+        if not self.is_available():
+            return False
+        cancellable = Gio.Cancellable()
+        timer = threading.Timer(timeout, cancellable.cancel)
+        timer.start()
+        try:
+            return self._monitor.can_reach(api_address(), cancellable)
+        except GLib.Error:
+            return False
+        finally:
+            timer.cancel()
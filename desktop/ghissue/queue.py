@@ -1,20 +1,55 @@
-"""Offline issue queue with JSON file persistence."""
+"""Offline issue queue with append-only journal persistence."""
 
 import json
 import os
-import tempfile
+import random
 import threading
 import time
 import uuid
-from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
 
 import requests
 
+from .api import BatchResult, RateLimitedError
+from .cancel import CancellationToken, CancelledError
+from .journal import Journal, JournalReplaced
+from .ledger import MARKER_OVERHEAD, SubmissionLedger, find_marker, mark_body
+
 _DATA_DIR = os.path.join(
     os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")),
     "ghissue",
 )
-_QUEUE_FILE = os.path.join(_DATA_DIR, "queue.json")
+_JOURNAL_FILE = os.path.join(_DATA_DIR, "queue.jsonl")
+# Whole-file JSON array used before the journal; migrated on first open.
+_LEGACY_QUEUE_FILE = os.path.join(_DATA_DIR, "queue.json")
+# Issues that failed for good, kept for inspection and re-queueing.
+_DEAD_LETTER_FILE = os.path.join(_DATA_DIR, "dead.jsonl")
+# Submissions in flight; see SubmissionLedger.
+_LEDGER_FILE = os.path.join(_DATA_DIR, "inflight.jsonl")
+
+# Repositories drained concurrently; order is kept within each repository.
+_DRAIN_WORKERS = 4
+# Issues created per GraphQL request during a drain.
+_DRAIN_BATCH_SIZE = 20
+# GitHub rejects longer titles and bodies; catch them before queueing.
+# Bodies also need room for the marker added when they are submitted.
+MAX_TITLE = 256
+MAX_BODY = 65536 - MARKER_OVERHEAD
+# When reconciling, also look at issues this much older than the
+# recorded submission time, in case the clocks disagree.
+_RECONCILE_SLACK = 300
+
+# Failed issues are retried after _RETRY_BASE * 2**(attempts - 1)
+# seconds, capped and jittered, until _MAX_ATTEMPTS failures.
+_RETRY_BASE = 30.0
+_RETRY_MAX = 6 * 3600.0
+_MAX_ATTEMPTS = 8
+# Failures no retry will fix; the issue goes straight to dead letters.
+# Any REST 4xx is permanent except these, which depend on the token or
+# on the rate limit rather than on the issue.
+_RETRYABLE_STATUSES = frozenset({401, 403, 429})
+_PERMANENT_ERROR_TYPES = frozenset({"NOT_FOUND", "UNPROCESSABLE", "FORBIDDEN"})
 
 
 @dataclass
@@ -26,104 +61,666 @@ class QueuedIssue:
     repo: str
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     timestamp: float = field(default_factory=time.time)
+    attempts: int = 0        # failed submissions so far
+    next_due: float = 0.0    # not retried before this time
+    last_error: str | None = None
+
+
+def _issue_from_dict(d: dict) -> QueuedIssue:
+    return QueuedIssue(
+        id=d["id"],
+        title=d["title"],
+        body=d["body"],
+        labels=d.get("labels", []),
+        owner=d["owner"],
+        repo=d["repo"],
+        timestamp=d.get("timestamp", 0),
+        attempts=d.get("attempts", 0),
+        next_due=d.get("next_due", 0.0),
+        last_error=d.get("last_error"),
+    )
+
+
+def length_error(title: str, body: str) -> str | None:
+    """Return why GitHub would reject *title* or *body* as too long, or None."""
+    if len(title) > MAX_TITLE:
+        return f"title longer than {MAX_TITLE} characters"
+    if len(body) > MAX_BODY:
+        return f"body longer than {MAX_BODY} characters"
+    return None
+
+
+def _is_permanent(kind: str | int | None) -> bool:
+    """Whether a BatchResult failure of this *kind* is one no retry will fix."""
+    if isinstance(kind, int):
+        return 400 <= kind < 500 and kind not in _RETRYABLE_STATUSES
+    return kind in _PERMANENT_ERROR_TYPES
+
+
+def _retry_delay(attempts: int) -> float:
+    delay = min(_RETRY_BASE * 2 ** (attempts - 1), _RETRY_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+@dataclass
+class RepoDrainStats:
+    submitted: int = 0
+    failed: int = 0     # moved to dead letters
+    deferred: int = 0   # scheduled for a retry
+    remaining: int = 0  # left in the queue when the drain stopped
+    elapsed: float = 0.0
 
 
 @dataclass
 class DrainResult:
     submitted: int = 0
     failed: int = 0
-    stopped_reason: str | None = None  # "network", "auth"
+    deferred: int = 0
+    total: int = 0      # issues due when the drain started
+    stopped_reason: str | None = None  # "network", "auth", "rate_limit", "cancelled", "error"
+    # Seconds after which issues left behind for reasons other than their
+    # own retry time (rate limit, stalled repository) should be tried again.
+    retry_after: float | None = None
+    elapsed: float = 0.0
+    repos: dict[str, RepoDrainStats] = field(default_factory=dict)  # by owner/repo
+
+
+@dataclass
+class QueueEntry:
+    """What the index knows about a queued issue, without its body."""
+    id: str
+    owner: str
+    repo: str
+    timestamp: float
+    size: int  # bytes of its journal record
+    next_due: float = 0.0
+
+
+@dataclass
+class _IndexEntry:
+    owner: str
+    repo: str
+    timestamp: float
+    offset: int  # position of the item's put record in the journal
+    length: int
+    next_due: float = 0.0
 
 
 class IssueQueue:
+    """FIFO of issues waiting to be submitted, stored in an append-only journal.
+
+    Enqueues append a record and removals append a tombstone, so neither
+    rewrites the queued bodies.  Once tombstones dominate the journal a
+    background thread compacts it.  A legacy ``queue.json`` is migrated
+    into the journal the first time the queue is opened.
+
+    An in-memory index (ids, per-repo counts, total bytes) answers count
+    queries.  It is folded forward from the journal tail whenever another
+    writer has appended, and rebuilt if the journal was replaced.  After
+    ``watch()`` the index only looks at the journal again once a file
+    monitor reports a change; otherwise each query costs one ``stat``.
+    """
+
     def __init__(self):
         self._lock = threading.Lock()
+        self._journal = Journal(_JOURNAL_FILE)
+        self._ledger = SubmissionLedger(_LEDGER_FILE)
+        self._dead_letters = Journal(_DEAD_LETTER_FILE)
+        self._index: dict[str, _IndexEntry] = {}
+        self._repo_counts: dict[tuple[str, str], int] = {}
+        self._total_bytes = 0
+        self._dead = 0
+        self._inode = None
+        self._consumed = 0
+        self._dirty = True
+        self._monitor = None
+        self._listeners = []
+        self._compacting = False
+        self._migrate()
 
-    def _load(self) -> list[dict]:
-        try:
-            with open(_QUEUE_FILE, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+    def _migrate(self):
+        if not os.path.exists(_LEGACY_QUEUE_FILE):
+            return
+        with self._journal.locked():
+            try:
+                with open(_LEGACY_QUEUE_FILE, "r") as f:
+                    items = json.load(f)
+            except FileNotFoundError:
+                return
+            except json.JSONDecodeError:
+                items = []
+            if not self._journal.exists():
+                self._journal.rewrite([i for i in items if "id" in i])
+            os.replace(_LEGACY_QUEUE_FILE, _LEGACY_QUEUE_FILE + ".migrated")
+
+    def watch(self):
+        """Watch the journal with a Gio.FileMonitor (needs a GLib main loop).
+
+        Until this is called every query stats the journal to notice
+        other writers.  Afterwards, callbacks added with
+        ``connect_changed()`` run on the main loop after each change,
+        whichever process or thread made it.
+        """
+        from gi.repository import Gio
 
-    def _save(self, items: list[dict]):
         os.makedirs(_DATA_DIR, exist_ok=True)
-        fd, tmp = tempfile.mkstemp(dir=_DATA_DIR, suffix=".tmp")
-        try:
-            with os.fdopen(fd, "w") as f:
-                json.dump(items, f, indent=2)
-            os.replace(tmp, _QUEUE_FILE)
-        except BaseException:
+        gfile = Gio.File.new_for_path(self._journal.path)
+        self._monitor = gfile.monitor_file(Gio.FileMonitorFlags.NONE, None)
+        self._monitor.connect("changed", self._on_journal_changed)
+
+    def connect_changed(self, callback):
+        """Call *callback()* on the main loop when the journal changes."""
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """Look at the journal again on the next query.
+
+        For when another process says it has written, since its file
+        monitor event may still be on the way.
+        """
+        self._dirty = True
+
+    def _on_journal_changed(self, _monitor, _file, _other, _event):
+        self._dirty = True
+        for callback in self._listeners:
+            callback()
+
+    # ── Index ──
+
+    def _reset_index(self):
+        self._index.clear()
+        self._repo_counts.clear()
+        self._total_bytes = 0
+        self._dead = 0
+        self._inode = None
+        self._consumed = 0
+
+    def _account(self, entry: _IndexEntry, sign: int):
+        key = (entry.owner, entry.repo)
+        n = self._repo_counts.get(key, 0) + sign
+        if n:
+            self._repo_counts[key] = n
+        else:
+            self._repo_counts.pop(key, None)
+        self._total_bytes += sign * entry.length
+
+    def _apply(self, offset: int, length: int, record: dict | None):
+        if record is None:
+            self._dead += 1
+            return
+        issue_id = record["id"]
+        if record.get("op") == "put":
+            item = record.get("item") or {}
+            prev = self._index.get(issue_id)
+            if prev is not None:
+                self._account(prev, -1)
+                self._dead += 1
+            entry = _IndexEntry(
+                owner=item.get("owner", ""),
+                repo=item.get("repo", ""),
+                timestamp=item.get("timestamp", 0),
+                offset=offset,
+                length=length,
+                next_due=item.get("next_due", 0.0),
+            )
+            self._index[issue_id] = entry
+            self._account(entry, +1)
+        elif record.get("op") == "del":
+            prev = self._index.pop(issue_id, None)
+            if prev is not None:
+                self._account(prev, -1)
+                self._dead += 1
+            self._dead += 1
+
+    def _sync(self):
+        """Bring the index up to date with the journal. Holds _lock."""
+        if self._monitor is not None and not self._dirty:
+            return
+        self._dirty = False
+        ident = self._journal.identity()
+        if ident is None:
+            self._reset_index()
+            return
+        inode, size = ident
+        if inode != self._inode or size < self._consumed:
+            self._reset_index()
+            self._inode = inode
+        if size == self._consumed:
+            return
+        for offset, length, record in self._journal.records(self._consumed):
+            self._apply(offset, length, record)
+            self._consumed = offset + length
+
+    def _after_write(self):
+        """Fold our own append into the index. Holds _lock."""
+        self._dirty = True
+        self._sync()
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Start a background compaction if tombstones dominate. Holds _lock."""
+        if self._compacting:
+            return
+        if not self._journal.needs_compaction(len(self._index), self._dead):
+            return
+        self._compacting = True
+
+        def _compact():
+            # Only under the journal's flock, so queries are not held up
+            # by the rewrite; the next one sees the new inode and rebuilds.
             try:
-                os.unlink(tmp)
-            except OSError:
-                pass
-            raise
+                self._journal.compact()
+                with self._lock:
+                    self._dirty = True
+            finally:
+                self._compacting = False
+
+        threading.Thread(target=_compact, daemon=True).start()
+
+    # ── Public API ──
+
+    # Writers append under the journal's flock first and take _lock only
+    # to fold the append into the index, so queries never wait for
+    # another writer or a compaction to release the flock.
 
     def enqueue(self, issue: QueuedIssue):
+        self._journal.put(issue.id, asdict(issue))
+        with self._lock:
+            self._after_write()
+
+    def enqueue_many(self, issues: list[QueuedIssue]):
+        """Enqueue *issues* with a single journal append."""
+        if not issues:
+            return
+        self._journal.put_many([asdict(i) for i in issues])
         with self._lock:
-            items = self._load()
-            items.append(asdict(issue))
-            self._save(items)
+            self._after_write()
 
     def remove(self, issue_id: str):
+        self._journal.delete(issue_id)
         with self._lock:
-            items = self._load()
-            items = [i for i in items if i.get("id") != issue_id]
-            self._save(items)
+            self._after_write()
+
+    def remove_many(self, issue_ids: list[str]):
+        self._journal.delete_many(issue_ids)
+        with self._lock:
+            self._after_write()
 
     def get_all(self) -> list[QueuedIssue]:
         with self._lock:
-            items = self._load()
-        return [
-            QueuedIssue(
-                id=i["id"],
-                title=i["title"],
-                body=i["body"],
-                labels=i.get("labels", []),
-                owner=i["owner"],
-                repo=i["repo"],
-                timestamp=i.get("timestamp", 0),
-            )
-            for i in items
-        ]
+            while True:
+                self._sync()
+                items = self._journal.read_items(
+                    ((e.offset, e.length) for e in self._index.values()),
+                    self._inode,
+                )
+                if items is not None or not self._index:
+                    break
+                # Replaced by another process's compaction; rebuild.
+                self._dirty = True
+        return [_issue_from_dict(i) for i in items or []]
+
+    def entries(self) -> list[QueueEntry]:
+        """Return index entries in queue order; no bodies are read."""
+        with self._lock:
+            self._sync()
+            return [
+                QueueEntry(id=issue_id, owner=e.owner, repo=e.repo,
+                           timestamp=e.timestamp, size=e.length,
+                           next_due=e.next_due)
+                for issue_id, e in self._index.items()
+            ]
+
+    def iter_issues(self, issue_ids=None):
+        """Yield queued issues (all, or those in *issue_ids*) in queue order.
+
+        Items are read from the journal one at a time as they are
+        consumed, so only the index is held in memory.
+        """
+        wanted = None if issue_ids is None else set(issue_ids)
+        while True:
+            with self._lock:
+                self._sync()
+                positions = [
+                    (e.offset, e.length)
+                    for issue_id, e in self._index.items()
+                    if wanted is None or issue_id in wanted
+                ]
+                inode = self._inode
+            if not positions:
+                return
+            try:
+                for item in self._journal.iter_items(positions, inode):
+                    yield _issue_from_dict(item)
+                return
+            except JournalReplaced:
+                # Compacted by another process before we started; rebuild.
+                with self._lock:
+                    self._dirty = True
 
     def count(self) -> int:
         with self._lock:
-            return len(self._load())
+            self._sync()
+            return len(self._index)
+
+    def count_for(self, owner: str, repo: str) -> int:
+        with self._lock:
+            self._sync()
+            return self._repo_counts.get((owner, repo), 0)
+
+    def repo_counts(self) -> dict[str, int]:
+        """Return queued issue counts keyed by ``owner/repo``."""
+        with self._lock:
+            self._sync()
+            return {f"{o}/{r}": n for (o, r), n in self._repo_counts.items()}
+
+    def total_bytes(self) -> int:
+        """Return the journal bytes taken by queued issues."""
+        with self._lock:
+            self._sync()
+            return self._total_bytes
+
+    def next_retry_at(self) -> float | None:
+        """Return the earliest future retry time of a queued issue, if any."""
+        now = time.time()
+        with self._lock:
+            self._sync()
+            pending = [e.next_due for e in self._index.values() if e.next_due > now]
+        return min(pending, default=None)
+
+    def retry_later(self, issues: list[QueuedIssue]):
+        """Store updated retry state for *issues*, keeping their places.
+
+        Issues removed from the queue meanwhile (e.g. dropped while they
+        were being submitted) stay removed.
+        """
+        if not issues:
+            return
+        with self._journal.locked():
+            with self._lock:
+                self._dirty = True
+                self._sync()
+                live = [asdict(i) for i in issues if i.id in self._index]
+            if not live:
+                return
+            self._journal.append_items(live)
+        with self._lock:
+            self._after_write()
+
+    def bury(self, issues: list[QueuedIssue]):
+        """Move *issues* from the queue to the dead letters."""
+        if not issues:
+            return
+        self._dead_letters.put_many([asdict(i) for i in issues], sync=True)
+        self.remove_many([i.id for i in issues])
+
+    def dead_letters(self) -> list[QueuedIssue]:
+        """Return issues that failed for good; ``last_error`` says why."""
+        if not self._dead_letters.exists():
+            return []
+        items, _dead = self._dead_letters.replay()
+        return [_issue_from_dict(i) for i in items.values()]
+
+    def requeue_dead(self, issue_ids: list[str] | None = None) -> int:
+        """Put dead letters (all, or those in *issue_ids*) back in the queue.
+
+        Retry state is reset.  Returns the number re-queued.
+        """
+        wanted = None if issue_ids is None else set(issue_ids)
+        issues = [
+            replace(i, attempts=0, next_due=0.0, last_error=None)
+            for i in self.dead_letters()
+            if wanted is None or i.id in wanted
+        ]
+        if issues:
+            self._journal.put_many([asdict(i) for i in issues], sync=True)
+            with self._lock:
+                self._after_write()
+            self.drop_dead([i.id for i in issues])
+        return len(issues)
+
+    def drop_dead(self, issue_ids: list[str]):
+        """Forget dead letters for good."""
+        if issue_ids:
+            self._dead_letters.delete_many(issue_ids)
+            live, dead = self._dead_letters.replay()
+            if self._dead_letters.needs_compaction(len(live), dead):
+                self._dead_letters.compact()
+
+    def _still_queued(self, issues: list[QueuedIssue]) -> list[QueuedIssue]:
+        """Return those of *issues* the journal still holds."""
+        with self._lock:
+            self._dirty = True
+            self._sync()
+            return [i for i in issues if i.id in self._index]
+
+    def _reconcile(self, api, token: str, issues: list[QueuedIssue],
+                   in_flight: dict[str, dict], stats: RepoDrainStats,
+                   cancel: CancellationToken | None = None) -> list[QueuedIssue]:
+        """Drop issues of one repository that already reached GitHub.
+
+        Issues the ledger still holds were interrupted mid-submission.
+        The repository's issues updated since then are searched for
+        their markers: matches are removed from the queue as submitted,
+        the rest are returned with everything else to be sent again.
+        """
+        ambiguous = [i for i in issues if i.id in in_flight]
+        if not ambiguous:
+            return issues
+        since = min(in_flight[i.id].get("started", i.timestamp)
+                    for i in ambiguous) - _RECONCILE_SLACK
+        created = set()
+        for _issue, body in api.list_issues_since(
+                token, ambiguous[0].owner, ambiguous[0].repo, since,
+                cancel=cancel):
+            marker = find_marker(body)
+            if marker in in_flight:
+                created.add(marker)
+        done = [i.id for i in ambiguous if i.id in created]
+        if done:
+            self.remove_many(done)
+        self._ledger.end([i.id for i in ambiguous])
+        stats.submitted += len(done)
+        stats.remaining -= len(done)
+        return [i for i in issues if i.id not in created]
 
-    def drain(self, api, token: str) -> DrainResult:
+    def drain(self, api, token: str, max_workers: int = _DRAIN_WORKERS,
+              batch_size: int = _DRAIN_BATCH_SIZE,
+              cancel: CancellationToken | None = None,
+              on_progress=None) -> DrainResult:
         """Submit all queued issues. Returns drain result.
 
+        Repositories are drained in parallel on up to *max_workers*
+        threads; issues for the same repository go out in queue order,
+        *batch_size* at a time through ``api.create_issues_batch``.
+
         - ConnectionError → stop (network down)
+        - ReadTimeout (request stalled) → give up on the repository for now;
+          its issues stay queued and are reconciled next time, which
+          ``retry_after`` in the result asks for
+        - *cancel* fired → stop
         - 401 → stop (auth invalid)
-        - Other HTTP error → skip item, continue
+        - Still rate limited after backoff → stop, item stays queued;
+          ``retry_after`` says when the limit lifts
+        - 400/404/410/422 → move item to dead letters, continue
+        - Other HTTP error, or per-issue error in a batch → retry the item
+          later with exponential backoff; after _MAX_ATTEMPTS failures it
+          moves to dead letters
+
+        Items whose retry is not yet due are left alone.
+
+        Each batch is recorded in the submission ledger before it is sent
+        and carries a hidden marker per issue.  Batches cut off before
+        their outcome was known are reconciled against GitHub at the
+        start of the next drain instead of being sent twice.
+
+        *on_progress(totals)* is called from the drain threads after each
+        batch with a DrainResult holding the running totals.
         """
+        started = time.monotonic()
         result = DrainResult()
         items = self.get_all()
+        in_flight = self._ledger.pending()
+        queued = {issue.id for issue in items}
+        self._ledger.end([i for i in in_flight if i not in queued])
+        now = time.time()
+        items = [i for i in items if i.next_due <= now]
         if not items:
             return result
+        result.total = len(items)
 
+        by_repo: dict[str, list[QueuedIssue]] = {}
         for issue in items:
+            by_repo.setdefault(f"{issue.owner}/{issue.repo}", []).append(issue)
+
+        stop = threading.Event()
+        stop_lock = threading.Lock()
+        totals = DrainResult(total=result.total)
+        progress_lock = threading.Lock()
+
+        def _progress(submitted: int, deferred: int, failed: int):
+            if on_progress is None:
+                return
+            with progress_lock:
+                totals.submitted += submitted
+                totals.deferred += deferred
+                totals.failed += failed
+                totals.elapsed = time.monotonic() - started
+                on_progress(replace(totals, repos={}))
+
+        def _stop(reason: str):
+            with stop_lock:
+                if result.stopped_reason is None:
+                    result.stopped_reason = reason
+            stop.set()
+
+        def _defer(seconds: float):
+            with stop_lock:
+                result.retry_after = max(result.retry_after or 0.0, seconds)
+
+        def _stop_on(e: requests.RequestException) -> bool:
+            reason = _stop_reason(e)
+            if reason is None:
+                return False
+            if isinstance(e, RateLimitedError):
+                _defer(e.retry_after or _RETRY_BASE)
+            _stop(reason)
+            return True
+
+        def _stop_reason(e: requests.RequestException) -> str | None:
+            if isinstance(e, requests.ConnectionError):
+                return "network"
+            if isinstance(e, RateLimitedError):
+                return "rate_limit"
+            if (isinstance(e, requests.HTTPError) and e.response is not None
+                    and e.response.status_code == 401):
+                return "auth"
+            return None
+
+        def _drain_repo(issues: list[QueuedIssue]) -> RepoDrainStats:
+            stats = RepoDrainStats(remaining=len(issues))
+            repo_started = time.monotonic()
             try:
-                api.create_issue(
-                    token=token,
-                    owner=issue.owner,
-                    repo=issue.repo,
-                    title=issue.title,
-                    body=issue.body,
-                    labels=issue.labels,
-                )
-                self.remove(issue.id)
-                result.submitted += 1
-            except requests.ConnectionError:
-                result.stopped_reason = "network"
-                break
-            except requests.HTTPError as e:
-                if e.response is not None and e.response.status_code == 401:
-                    result.stopped_reason = "auth"
+                issues = self._reconcile(api, token, issues, in_flight, stats,
+                                         cancel)
+            except CancelledError:
+                _stop("cancelled")
+                issues = []
+            except requests.ReadTimeout:
+                _defer(_RETRY_BASE)
+                issues = []
+            except requests.RequestException as e:
+                if _stop_on(e):
+                    issues = []
+                # Otherwise the lookup failed for good; resubmit.
+            except (ValueError, KeyError, TypeError):
+                # Malformed lookup reply; reconcile again next drain.
+                _defer(_RETRY_BASE)
+                issues = []
+            if stats.submitted:
+                _progress(stats.submitted, 0, 0)  # found by reconciling
+            for i in range(0, len(issues), batch_size):
+                if stop.is_set():
                     break
-                result.failed += 1
-                self.remove(issue.id)
+                batch = issues[i:i + batch_size]
+                # Skip issues dropped from the queue since the drain began.
+                queued = self._still_queued(batch)
+                stats.remaining -= len(batch) - len(queued)
+                batch = queued
+                if not batch:
+                    continue
+                # Until end() below, a crash leaves these to reconcile.
+                self._ledger.begin(batch)
+                try:
+                    batch_result = api.create_issues_batch(token, [
+                        replace(issue, body=mark_body(issue.body, issue.id))
+                        for issue in batch
+                    ], cancel=cancel)
+                except CancelledError:
+                    _stop("cancelled")
+                    break
+                except requests.ReadTimeout:
+                    # Stalled; left in the ledger, move on to other repos.
+                    _defer(_RETRY_BASE)
+                    break
+                except (requests.ConnectionError, requests.HTTPError) as e:
+                    if _stop_on(e):
+                        # Left in the ledger: some may have gone through.
+                        break
+                    batch_result = BatchResult(
+                        errors={issue.id: str(e) for issue in batch},
+                    )
+                    if e.response is not None:
+                        batch_result.kinds = {
+                            issue.id: e.response.status_code for issue in batch
+                        }
+                except (requests.RequestException, ValueError, KeyError,
+                        TypeError) as e:
+                    # Broken transfer or malformed reply: retry the batch.
+                    batch_result = BatchResult(
+                        errors={issue.id: f"{type(e).__name__}: {e}" for issue in batch},
+                    )
+                retry, dead = [], []
+                for issue in batch:
+                    if issue.id in batch_result.issues:
+                        continue
+                    attempts = issue.attempts + 1
+                    failed = replace(
+                        issue,
+                        attempts=attempts,
+                        next_due=time.time() + _retry_delay(attempts),
+                        last_error=batch_result.errors.get(issue.id, "unknown error"),
+                    )
+                    if (_is_permanent(batch_result.kinds.get(issue.id))
+                            or attempts >= _MAX_ATTEMPTS):
+                        dead.append(failed)
+                    else:
+                        retry.append(failed)
+                self.remove_many(list(batch_result.issues))
+                self.retry_later(retry)
+                self.bury(dead)
+                self._ledger.end([issue.id for issue in batch])
+                stats.submitted += len(batch_result.issues)
+                stats.deferred += len(retry)
+                stats.failed += len(dead)
+                stats.remaining -= len(batch) - len(retry)
+                _progress(len(batch_result.issues), len(retry), len(dead))
+            stats.elapsed = time.monotonic() - repo_started
+            return stats
+
+        workers = max(1, min(max_workers, len(by_repo)))
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix="ghissue-drain") as pool:
+            futures = {
+                key: pool.submit(_drain_repo, issues)
+                for key, issues in by_repo.items()
+            }
+            for key, future in futures.items():
+                stats = future.result()
+                result.repos[key] = stats
+                result.submitted += stats.submitted
+                result.failed += stats.failed
+                result.deferred += stats.deferred
 
+        result.elapsed = time.monotonic() - started
         return result
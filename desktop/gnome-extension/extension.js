@@ -48,6 +48,7 @@ class GhissueRepoButton extends PanelMenu.Button {
 
         this._queueItem = new PopupMenu.PopupMenuItem('Queue: 0 pending');
         this._queueItem.setSensitive(false);
+        this._queueItem.visible = false;
         this.menu.addMenuItem(this._queueItem);
 
         this.menu.addMenuItem(new PopupMenu.PopupSeparatorMenuItem());
@@ -55,11 +56,6 @@ class GhissueRepoButton extends PanelMenu.Button {
         const quitItem = new PopupMenu.PopupMenuItem('Quit');
         quitItem.connect('activate', () => this._dbusCall('Quit'));
         this.menu.addMenuItem(quitItem);
-
-        this.menu.connect('open-state-changed', (menu, open) => {
-            if (open)
-                this._refreshQueueCount();
-        });
     }
 
     vfunc_event(event) {
@@ -85,6 +81,15 @@ class GhissueRepoButton extends PanelMenu.Button {
         this._updateStyle();
     }
 
+    setQueueCount(count) {
+        if (count > 0) {
+            this._queueItem.label.set_text(`Queue: ${count} pending`);
+            this._queueItem.visible = true;
+        } else {
+            this._queueItem.visible = false;
+        }
+    }
+
     _updateStyle() {
         const opacity = this._daemonRunning ? 255 : 128;
         this._dot.set_opacity(opacity);
@@ -119,38 +124,15 @@ class GhissueRepoButton extends PanelMenu.Button {
             }
         );
     }
-
-    _refreshQueueCount() {
-        if (!this._daemonRunning)
-            return;
-
-        Gio.DBus.session.call(
-            BUS_NAME, OBJECT_PATH, IFACE_NAME, 'GetQueueCount',
-            null,
-            new GLib.VariantType('(i)'),
-            Gio.DBusCallFlags.NONE, 5000, null,
-            (conn, res) => {
-                try {
-                    const reply = conn.call_finish(res);
-                    const [count] = reply.deepUnpack();
-                    if (count > 0) {
-                        this._queueItem.label.set_text(`Queue: ${count} pending`);
-                        this._queueItem.visible = true;
-                    } else {
-                        this._queueItem.visible = false;
-                    }
-                } catch (e) {
-                    logError(e, 'ghissue: GetQueueCount failed');
-                }
-            }
-        );
-    }
 });
 
 export default class GhissueExtension {
     enable() {
         this._buttons = [];
         this._daemonRunning = false;
+        this._generation = 0;
+        this._repos = [];
+        this._queueCount = 0;
 
         this._watchId = Gio.bus_watch_name(
             Gio.BusType.SESSION,
@@ -158,7 +140,9 @@ export default class GhissueExtension {
             Gio.BusNameWatcherFlags.NONE,
             () => {
                 this._daemonRunning = true;
-                this._rebuildButtons();
+                // A restarted daemon counts generations from scratch
+                this._generation = 0;
+                this._fetchState();
             },
             () => {
                 this._daemonRunning = false;
@@ -167,24 +151,38 @@ export default class GhissueExtension {
             },
         );
 
-        // Listen for ReposChanged signal
-        this._signalId = Gio.DBus.session.signal_subscribe(
+        // The daemon pushes changes; these carry the new state
+        this._reposSignalId = Gio.DBus.session.signal_subscribe(
             BUS_NAME, IFACE_NAME, 'ReposChanged',
             OBJECT_PATH, null, Gio.DBusSignalFlags.NONE,
-            () => this._rebuildButtons(),
+            (conn, sender, path, iface, signal, params) => {
+                const [generation, repos] = params.deepUnpack();
+                this._applyRepos(generation, repos);
+            },
+        );
+        this._queueSignalId = Gio.DBus.session.signal_subscribe(
+            BUS_NAME, IFACE_NAME, 'QueueChanged',
+            OBJECT_PATH, null, Gio.DBusSignalFlags.NONE,
+            (conn, sender, path, iface, signal, params) => {
+                const [count] = params.deepUnpack();
+                this._applyQueueCount(count);
+            },
         );
     }
 
     disable() {
-        if (this._signalId) {
-            Gio.DBus.session.signal_unsubscribe(this._signalId);
-            this._signalId = null;
+        for (const id of [this._reposSignalId, this._queueSignalId]) {
+            if (id)
+                Gio.DBus.session.signal_unsubscribe(id);
         }
+        this._reposSignalId = null;
+        this._queueSignalId = null;
         if (this._watchId) {
             Gio.bus_unwatch_name(this._watchId);
             this._watchId = null;
         }
         this._destroyButtons();
+        this._repos = [];
     }
 
     _destroyButtons() {
@@ -193,40 +191,55 @@ export default class GhissueExtension {
         this._buttons = [];
     }
 
-    _rebuildButtons() {
-        if (!this._daemonRunning)
-            return;
-
-        // Fetch repos from daemon
+    _fetchState() {
         Gio.DBus.session.call(
-            BUS_NAME, OBJECT_PATH, IFACE_NAME, 'GetRepos',
+            BUS_NAME, OBJECT_PATH, IFACE_NAME, 'GetState',
             null,
-            new GLib.VariantType('(s)'),
+            new GLib.VariantType('(a{sv})'),
             Gio.DBusCallFlags.NONE, 5000, null,
             (conn, res) => {
                 try {
                     const reply = conn.call_finish(res);
-                    const [jsonStr] = reply.deepUnpack();
-                    const repos = JSON.parse(jsonStr);
-                    this._applyRepos(repos);
+                    const [state] = reply.deepUnpack();
+                    this._applyQueueCount(state['queue-count'].deepUnpack());
+                    this._applyRepos(
+                        state['repos-generation'].deepUnpack(),
+                        state['repos'].deepUnpack(),
+                    );
                 } catch (e) {
-                    logError(e, 'ghissue: GetRepos failed');
+                    logError(e, 'ghissue: GetState failed');
                 }
             }
         );
     }
 
-    _applyRepos(repos) {
-        this._destroyButtons();
+    _applyQueueCount(count) {
+        this._queueCount = count;
+        for (const btn of this._buttons)
+            btn.setQueueCount(count);
+    }
+
+    _applyRepos(generation, repos) {
+        // Ignore a reply or signal older than what we already show
+        if (generation <= this._generation)
+            return;
+        this._generation = generation;
+
+        const same = repos.length === this._repos.length &&
+            repos.every((r, i) => r.every((v, j) => v === this._repos[i][j]));
+        this._repos = repos;
+        if (same && this._buttons.length === repos.length) {
+            for (const btn of this._buttons)
+                btn.setDaemonRunning(this._daemonRunning);
+            return;
+        }
 
-        for (const repo of repos) {
-            const btn = new GhissueRepoButton(
-                repo.owner, repo.name, repo.color, this
-            );
+        this._destroyButtons();
+        for (const [owner, name, color] of repos) {
+            const btn = new GhissueRepoButton(owner, name, color, this);
             btn.setDaemonRunning(this._daemonRunning);
-            Main.panel.addToStatusArea(
-                `ghissue-${repo.owner}-${repo.name}`, btn
-            );
+            btn.setQueueCount(this._queueCount);
+            Main.panel.addToStatusArea(`ghissue-${owner}-${name}`, btn);
             this._buttons.push(btn);
         }
     }
@@ -10,7 +10,7 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "ghissue=ghissue.main:main",
+            "ghissue=ghissue.client:main",
         ],
     },
     python_requires=">=3.10",